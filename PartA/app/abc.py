@@ -1,6 +1,8 @@
 import os
 import json
-from extract_structure import extract_line_features_with_text_stats, filter_candidates
+from functools import partial
+import parallel
+from extract_structure import extract_line_features, filter_candidate_features, stream_candidates
 import nltk
 nltk.download('punkt_tab')
 nltk.download('averaged_perceptron_tagger_eng')
@@ -10,22 +12,27 @@ def save_json(data, output_path):
     with open(output_path, "w", encoding="utf-8") as f:
         json.dump(data, f, indent=2, ensure_ascii=False)
 
+def process_pdf(pdf_path, pos_features=True, stream=False):
+    if stream:
+        return [
+            line
+            for _, page_candidates in stream_candidates(pdf_path, pos_features=pos_features)
+            for line in page_candidates.to_records()
+        ]
+    features = extract_line_features(pdf_path, pos_features=pos_features)
+    return filter_candidate_features(features).to_records()
+
 def main():
+    parser = parallel.add_fast_option(parallel.build_parser("Extract candidate heading lines with their features."))
+    args = parallel.add_stream_option(parser).parse_args()
+    process = partial(process_pdf, pos_features=not args.fast, stream=args.stream)
     input_dir = "/app/input" if os.getenv("DOCKER") == "true" else "./input"
     output_dir = "/app/output" if os.getenv("DOCKER") == "true" else "./output"
     os.makedirs(output_dir, exist_ok=True)
 
-    for filename in os.listdir(input_dir):
-        if not filename.lower().endswith(".pdf"):
-            continue
-
-        pdf_path = os.path.join(input_dir, filename)
-
-        print(f"Processing: {filename}")
-
-        all_lines = extract_line_features_with_text_stats(pdf_path)
-
-        candidates = filter_candidates(all_lines)
+    pdf_paths = [os.path.join(input_dir, f) for f in parallel.list_pdfs(input_dir)]
+    for pdf_path, candidates in parallel.run(pdf_paths, process, args.workers):
+        filename = os.path.basename(pdf_path)
 
         base_name = os.path.splitext(filename)[0]
         output_filename = f"{base_name}_raw.json"
@@ -0,0 +1,31 @@
+import sys
+import time
+from extract_structure import CandidateStats, filter_candidate_features
+from line_features import LineFeatures
+from reference_impl import filter_candidates_reference, synthetic_pages
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+def main():
+    n_pages = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    lines = synthetic_pages(n_pages)
+    features = LineFeatures.from_records(lines)
+
+    t_ref, ref = timed(filter_candidates_reference, lines)
+    t_vec, vec = timed(filter_candidate_features, features)
+    assert vec.to_records() == ref, "filtered candidates differ"
+
+    t_stats, stats = timed(CandidateStats, features)
+    t_mask, _ = timed(stats.mask, 0.5, 4)
+
+    print(f"{n_pages} pages, {len(lines)} lines → {len(vec)} candidates")
+    print(f"per-page Python filter:  {t_ref:8.3f} s")
+    print(f"vectorized filter:       {t_vec:8.3f} s  ({t_ref / max(t_vec, 1e-9):.0f}x)")
+    print(f"  CandidateStats build:  {t_stats:8.3f} s")
+    print(f"  re-mask with new z:    {t_mask * 1e3:8.3f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import os
+import time
+import warnings
+import joblib
+from extract_structure import extract_line_features_with_text_stats, filter_candidates
+from main_new import MODEL_PATH, SCALER_PATH, FEATURE_KEYS, apply_model, apply_model_batch
+
+warnings.filterwarnings("ignore")
+
+REPEATS = 5
+
+def apply_model_per_line(lines, model, scaler, feature_keys):
+    """The original inference loop: one scaler/model call per candidate line."""
+    outline = []
+    for line in lines:
+        features = [line.get(k, 0) for k in feature_keys]
+        scaled = scaler.transform([features])
+        pred = model.predict(scaled)[0]
+        if pred != "BODY":
+            outline.append({"level": pred, "text": line["text"], "page": line["page"]})
+    return outline
+
+def timed(fn, *args):
+    best = float("inf")
+    result = None
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def main():
+    input_dir = "/app/input" if os.getenv("DOCKER") == "true" else "./input"
+    model = joblib.load(MODEL_PATH)
+    scaler = joblib.load(SCALER_PATH)
+
+    docs = []
+    for filename in sorted(os.listdir(input_dir)):
+        if not filename.lower().endswith(".pdf"):
+            continue
+        lines = extract_line_features_with_text_stats(os.path.join(input_dir, filename))
+        docs.append((filename, filter_candidates(lines)))
+
+    total_lines = sum(len(lines) for _, lines in docs)
+    print(f"{len(docs)} documents, {total_lines} candidate lines, best of {REPEATS}")
+    print(f"{'document':<45}{'lines':>7}{'per-line (ms)':>15}{'batched (ms)':>14}{'speedup':>9}")
+
+    per_line_total = batched_total = 0.0
+    for filename, lines in docs:
+        t_line, out_line = timed(apply_model_per_line, lines, model, scaler, FEATURE_KEYS)
+        t_batch, out_batch = timed(apply_model, lines, model, scaler, FEATURE_KEYS)
+        assert out_line == out_batch, f"batched output differs for {filename}"
+        per_line_total += t_line
+        batched_total += t_batch
+        speedup = t_line / max(t_batch, 1e-9)
+        print(f"{filename:<45}{len(lines):>7}{t_line * 1e3:>15.2f}{t_batch * 1e3:>14.2f}{speedup:>8.1f}x")
+
+    all_lines = [lines for _, lines in docs]
+    t_corpus, _ = timed(apply_model_batch, all_lines, model, scaler, FEATURE_KEYS)
+    print(f"\nper-line total: {per_line_total * 1e3:.2f} ms "
+          f"({total_lines / max(per_line_total, 1e-9):.0f} lines/s)")
+    print(f"batched total:  {batched_total * 1e3:.2f} ms "
+          f"({total_lines / max(batched_total, 1e-9):.0f} lines/s)")
+    print(f"one corpus batch: {t_corpus * 1e3:.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+import sys
+import time
+from extract_structure import merge_similar_multiline_rows
+from reference_impl import merge_rows_reference, synthetic_lines
+
+def timed(fn, df):
+    start = time.perf_counter()
+    result = fn(df)
+    return time.perf_counter() - start, result
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    df = synthetic_lines(n)
+
+    t_ref, ref = timed(merge_rows_reference, df)
+    t_vec, vec = timed(merge_similar_multiline_rows, df)
+    assert vec.to_dict(orient="records") == ref.to_dict(orient="records"), "merged rows differ"
+
+    print(f"{n} lines → {len(vec)} merged rows")
+    print(f"row loop:    {t_ref:8.3f} s")
+    print(f"run-length:  {t_vec:8.3f} s  ({t_ref / max(t_vec, 1e-9):.0f}x)")
+
+if __name__ == "__main__":
+    main()
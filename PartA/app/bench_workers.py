@@ -0,0 +1,29 @@
+import os
+import time
+import argparse
+import parallel
+from main_new import init_worker, process_pdf
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput of main_new.process_pdf across worker counts.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--repeat", type=int, default=4,
+                        help="process each input PDF this many times to give the pool enough work")
+    args = parser.parse_args()
+
+    input_dir = "/app/input" if os.getenv("DOCKER") == "true" else "./input"
+    pdf_paths = [os.path.join(input_dir, f) for f in parallel.list_pdfs(input_dir)] * args.repeat
+
+    print(f"{len(pdf_paths)} documents per run, {os.cpu_count()} CPUs")
+    print(f"{'workers':>8}{'seconds':>10}{'docs/s':>10}{'speedup':>9}")
+    baseline = None
+    for workers in args.workers:
+        start = time.perf_counter()
+        for _ in parallel.run(pdf_paths, process_pdf, workers, init_worker):
+            pass
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"{workers:>8}{elapsed:>10.2f}{len(pdf_paths) / elapsed:>10.2f}{baseline / elapsed:>8.2f}x")
+
+if __name__ == "__main__":
+    main()
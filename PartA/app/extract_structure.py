@@ -4,162 +4,332 @@ import json
 import re
 import fitz  
 import nltk
+import numpy as np
 import pandas as pd
-from collections import defaultdict, Counter
-from statistics import mean, stdev
+from collections import Counter, OrderedDict
 from nltk.tokenize import word_tokenize
-from nltk.tag import pos_tag
+from nltk.tag import pos_tag_sents
+from line_features import LineFeatures, COLUMN_INDEX
 
 nltk.download("punkt", quiet=True)
 nltk.download("averaged_perceptron_tagger", quiet=True)
 
-def extract_line_features_with_text_stats(pdf_path):
+POS_TAG_GROUPS = {
+    "num_verbs": ("VB", "VBD", "VBG", "VBN", "VBP", "VBZ"),
+    "num_nouns": ("NN", "NNS", "NNP", "NNPS"),
+    "num_adjectives": ("JJ", "JJR", "JJS"),
+    "num_adverbs": ("RB", "RBR", "RBS"),
+    "num_pronouns": ("PRP", "PRP$", "WP", "WP$"),
+    "num_cardinals": ("CD",),
+    "num_conjunctions": ("CC",),
+    "num_predeterminers": ("PDT",),
+    "num_interjections": ("UH",),
+}
 
-    doc = fitz.open(pdf_path)
-    all_lines = []
-    alnum_pattern = re.compile(r"[A-Za-z0-9]")
 
+class PosCountCache:
+    """LRU cache of POS group counts keyed by normalized line text."""
+
+    def __init__(self, maxsize=8192):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+
+    def get(self, key):
+        counts = self._data.get(key)
+        if counts is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._data.move_to_end(key)
+        return counts
+
+    def put(self, key, counts):
+        self._data[key] = counts
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+        self.hits = self.misses = 0
+
+
+pos_cache = PosCountCache()
+
+
+def normalize_line_text(text):
+    return " ".join(text.split())
+
+
+def count_pos_groups(texts, cache=pos_cache):
+    """
+    Return one {feature: count} dict per text. Texts missing from the cache
+    are tokenized and tagged together in a single pos_tag_sents call.
+    """
+    keys = [normalize_line_text(t) for t in texts]
+    found = {}
+    misses = []
+    for key in dict.fromkeys(keys):
+        counts = cache.get(key)
+        if counts is None:
+            misses.append(key)
+        else:
+            found[key] = counts
+
+    if misses:
+        tagged = pos_tag_sents([word_tokenize(key) for key in misses])
+        for key, pos_tags in zip(misses, tagged):
+            tag_counts = Counter(tag for _, tag in pos_tags)
+            counts = {
+                name: sum(tag_counts[tag] for tag in tags)
+                for name, tags in POS_TAG_GROUPS.items()
+            }
+            cache.put(key, counts)
+            found[key] = counts
+
+    return [found[key] for key in keys]
+
+
+ALNUM_PATTERN = re.compile(r"[A-Za-z0-9]")
+
+
+def extract_page_features(page, page_index):
+    """
+    Extract the features of one page's lines straight into a LineFeatures
+    store, with spacing_before and spacing_after computed within the page.
+    POS counts are left at 0.
+    """
+    blocks = page.get_text("dict")["blocks"]
+    texts = []
+    rows = []
+    pos_zeros = [0] * len(POS_TAG_GROUPS)
+
+    for block in blocks:
+        for line in block.get("lines", []):
+            spans = line.get("spans", [])
+            if not spans:
+                continue
+
+            raw_text = "".join(span["text"] for span in spans)
+            text = re.sub(r"\s{2,}", " ", raw_text).strip()
+            if not text or not ALNUM_PATTERN.search(text):
+                continue
+
+            first_span = spans[0]
+            font_size = first_span.get("size", 0)
+            font_flags = first_span.get("flags", 0)
+            is_bold = bool(font_flags & 2)
+            is_upper = text.isupper()
+            indent = round(first_span.get("origin", [0])[0], 2)
+            y_top = line["bbox"][1]
+            y_bottom = line["bbox"][3]
+            num_words = len(text.split())
+
+            texts.append(text)
+            # Row in NUMERIC_KEYS order; spacing is filled in below
+            rows.append([
+                font_size, int(is_bold), 0, 0,
+                indent, len(text), int(is_upper), y_top, y_bottom,
+                int(text.endswith(":")), int(num_words <= 8),
+                int(bool(re.match(r"^\d+(\.\d+)*", text))), int(page_index == 0),
+                page_index, num_words, *pos_zeros
+            ])
+
+    top, bottom = COLUMN_INDEX["line_top"], COLUMN_INDEX["line_bottom"]
+    before, after = COLUMN_INDEX["spacing_before"], COLUMN_INDEX["spacing_after"]
+    for i, row in enumerate(rows):
+        row[before] = round(abs(row[top] - (rows[i - 1][bottom] if i > 0 else 0)), 2)
+        row[after] = round(abs((rows[i + 1][top] - row[bottom]) if i < len(rows) - 1 else 0), 2)
+
+    return LineFeatures.from_rows(rows, texts)
+
+
+def fill_pos_features(features):
+    """Write batched POS group counts into the POS columns of a LineFeatures."""
+    if not len(features):
+        return
+    counts = count_pos_groups(features.text.tolist())
+    columns = [COLUMN_INDEX[name] for name in POS_TAG_GROUPS]
+    features.values[:, columns] = [[c[name] for name in POS_TAG_GROUPS] for c in counts]
+
+
+def iter_page_features(pdf_path):
+    """Yield (page_index, LineFeatures) one page at a time, without POS counts."""
+    doc = fitz.open(pdf_path)
     for page_index, page in enumerate(doc):
-        blocks = page.get_text("dict")["blocks"]
-        page_lines = []
-
-        for block in blocks:
-            for line in block.get("lines", []):
-                spans = line.get("spans", [])
-                if not spans:
-                    continue
-
-                raw_text = "".join(span["text"] for span in spans)
-                text = re.sub(r"\s{2,}", " ", raw_text).strip()
-                if not text or not alnum_pattern.search(text):
-                    continue
-
-                first_span = spans[0]
-                font_size = first_span.get("size", 0)
-                font_flags = first_span.get("flags", 0)
-                is_bold = bool(font_flags & 2)
-                is_upper = text.isupper()
-                indent = round(first_span.get("origin", [0])[0], 2)
-                y_top = line["bbox"][1]
-                y_bottom = line["bbox"][3]
-                num_words = len(text.split())
-
-                # POS tagging
-                tokens = word_tokenize(text)
-                pos_tags = pos_tag(tokens)
-                tag_counts = Counter(tag for _, tag in pos_tags)
-
-                page_lines.append({
-                    "text": text,
-                    "font_size": font_size,
-                    "bold": int(is_bold),
-                    "length": len(text),
-                    "is_upper": int(is_upper),
-                    "indent": indent,
-                    "line_top": y_top,
-                    "line_bottom": y_bottom,
-                    "spacing_before": None, 
-                    "spacing_after": None,
-                    "ends_with_colon": int(text.endswith(":")),
-                    "is_short": int(num_words <= 8),
-                    "is_numbered": int(bool(re.match(r"^\d+(\.\d+)*", text))),
-                    "first_page": int(page_index == 0),
-                    "page": page_index,
-                    "num_words": num_words,
-                    "num_verbs": tag_counts["VB"] + tag_counts["VBD"] + tag_counts["VBG"] + tag_counts["VBN"] + tag_counts["VBP"] + tag_counts["VBZ"],
-                    "num_nouns": tag_counts["NN"] + tag_counts["NNS"] + tag_counts["NNP"] + tag_counts["NNPS"],
-                    "num_adjectives": tag_counts["JJ"] + tag_counts["JJR"] + tag_counts["JJS"],
-                    "num_adverbs": tag_counts["RB"] + tag_counts["RBR"] + tag_counts["RBS"],
-                    "num_pronouns": tag_counts["PRP"] + tag_counts["PRP$"] + tag_counts["WP"] + tag_counts["WP$"],
-                    "num_cardinals": tag_counts["CD"],
-                    "num_conjunctions": tag_counts["CC"],
-                    "num_predeterminers": tag_counts["PDT"],
-                    "num_interjections": tag_counts["UH"]
-                })
-
-        for i, line in enumerate(page_lines):
-            line["spacing_before"] = round(abs(line["line_top"] - (page_lines[i - 1]["line_bottom"] if i > 0 else 0)), 2)
-            line["spacing_after"] = round(abs((page_lines[i + 1]["line_top"] - line["line_bottom"]) if i < len(page_lines) - 1 else 0), 2)
-            all_lines.append(line)
-
-    return all_lines  
+        yield page_index, extract_page_features(page, page_index)
+
+
+def extract_line_features(pdf_path, pos_features=True):
+    """
+    Extract per-line layout and text features into a LineFeatures store.
+    POS counts are filled in after the page walk with one batched tagging
+    pass over the document; with pos_features=False tagging is skipped
+    and the counts stay 0.
+    """
+    features = LineFeatures.concat([f for _, f in iter_page_features(pdf_path)])
+    if pos_features:
+        fill_pos_features(features)
+    return features
+
+
+def extract_line_features_with_text_stats(pdf_path, pos_features=True):
+    """Same as extract_line_features, exported as *_raw.json line dicts."""
+    return extract_line_features(pdf_path, pos_features=pos_features).to_records()
+
+
+MERGE_KEYS = [
+    "font_size", "bold", "is_upper", "ends_with_colon",
+    "is_short", "is_numbered", "page", "first_page"
+]
 
 
 def merge_similar_multiline_rows(df):
+    """
+    Merge consecutive rows (in page, line_top order) whose MERGE_KEYS all
+    match into one row, as a run-length grouping: a new group starts
+    wherever any key column differs from the previous row. Each group keeps its first row's
+    values, with the texts joined, length and num_words summed, and the
+    line_top/line_bottom extent widened.
+    """
     if df.empty:
         return df
 
     df = df.sort_values(by=["page", "line_top"]).reset_index(drop=True)
-    merged_rows = []
-    current = df.iloc[0].to_dict()
-
-    for i in range(1, len(df)):
-        row = df.iloc[i]
-        keys_to_match = [
-            "font_size", "bold", "is_upper", "ends_with_colon",
-            "is_short", "is_numbered", "page", "first_page"
-        ]
-        if all(current.get(k) == row[k] for k in keys_to_match):
-            current["text"] += " " + row["text"]
-            current["length"] += row["length"]
-            current["num_words"] += row["num_words"]
-            current["line_top"] = min(current["line_top"], row["line_top"])
-            current["line_bottom"] = max(current["line_bottom"], row["line_bottom"])
-        else:
-            merged_rows.append(current)
-            current = row.to_dict()
+    keys = df[MERGE_KEYS].to_numpy()
+    starts_group = np.ones(len(df), dtype=bool)
+    starts_group[1:] = (keys[1:] != keys[:-1]).any(axis=1)
+    starts = np.flatnonzero(starts_group)
 
-    merged_rows.append(current)
-    return pd.DataFrame(merged_rows)
+    ends = np.append(starts[1:], len(df))
 
+    texts = df["text"].tolist()
+    merged = df.iloc[starts].reset_index(drop=True)
+    merged["text"] = [" ".join(texts[a:b]) for a, b in zip(starts.tolist(), ends.tolist())]
+    merged["length"] = np.add.reduceat(df["length"].to_numpy(), starts)
+    merged["num_words"] = np.add.reduceat(df["num_words"].to_numpy(), starts)
+    merged["line_top"] = np.minimum.reduceat(df["line_top"].to_numpy(), starts)
+    merged["line_bottom"] = np.maximum.reduceat(df["line_bottom"].to_numpy(), starts)
+    return merged
 
-def filter_candidates(lines, z=0.25, remove_repetitive_headers=True):
-    from statistics import mean, stdev
 
-    alnum_pattern = re.compile(r"[A-Za-z0-9]")
-    lines_by_page = defaultdict(list)
-    for line in lines:
-        lines_by_page[line["page"]].append(line)
+def header_keys(features):
+    """The (text, top) key of every line, used to spot repeated headers/footers."""
+    return [
+        (text.strip().lower(), round(top, 1))
+        for text, top in zip(features.text.tolist(), features["line_top"].tolist())
+    ]
 
-    filtered = []
-    text_position_counts = defaultdict(int)
-    page_heights = {}
 
-    for page, page_lines in lines_by_page.items():
-        page_heights[page] = max((l.get("line_bottom", 0) for l in page_lines), default=800)
-        for line in page_lines:
-            key = (line["text"].strip().lower(), round(line.get("line_top", 0), 1))
-            text_position_counts[key] += 1
+class CandidateStats:
+    """
+    Per-line filter statistics for a document, computed once with grouped
+    array operations: page font-size mean/std, last-line flags, repeated
+    (text, top) counts and the text-shape checks. mask() and candidates()
+    then re-select for any z or header-repeat threshold without touching
+    the lines again.
 
-    for page, page_lines in lines_by_page.items():
-        font_sizes = [l["font_size"] for l in page_lines]
-        mu = mean(font_sizes)
-        sigma = stdev(font_sizes) if len(font_sizes) > 1 else 0
-        font_threshold = mu + z * sigma
+    header_counts, when given, is a per-line array of (text, top) repeat
+    counts computed elsewhere (the streaming path counts across pages).
+    """
 
-        sorted_lines = sorted(page_lines, key=lambda x: x["line_top"])
-        first_line = sorted_lines[0]["text"].strip()
-        last_line = sorted_lines[-1]["text"].strip()
+    def __init__(self, features, header_counts=None):
+        self.features = features
+        n = len(features)
+        texts = [t.strip() for t in features.text.tolist()]
+        font_sizes = features["font_size"]
+        tops = features["line_top"]
 
-        for line in page_lines:
-            text = line["text"].strip()
-            alnum_count = sum(c.isalnum() for c in text)
-            y_top = line.get("line_top", 0)
-            key = (text.lower(), round(y_top, 1))
+        _, page_ids, page_sizes = np.unique(features["page"], return_inverse=True, return_counts=True)
+        page_ids = page_ids.reshape(-1)
 
-            if text == last_line:
-                continue
-            if remove_repetitive_headers and text_position_counts[key] >= 3:
-                continue
-            if alnum_count < 3:
-                continue
-            if len(text) > 100 or len(text.split()) > 15:
-                continue
-            if line["font_size"] < font_threshold:
-                continue
+        # Page font-size mean and sample std; uniform pages get their exact size
+        page_mean = np.bincount(page_ids, weights=font_sizes) / page_sizes
+        page_min = np.full(len(page_sizes), np.inf)
+        page_max = np.full(len(page_sizes), -np.inf)
+        np.minimum.at(page_min, page_ids, font_sizes)
+        np.maximum.at(page_max, page_ids, font_sizes)
+        uniform = page_min == page_max
+        page_mean[uniform] = page_min[uniform]
+        squared = np.bincount(page_ids, weights=(font_sizes - page_mean[page_ids]) ** 2)
+        page_std = np.sqrt(squared / np.maximum(page_sizes - 1, 1))
+        page_std[(page_sizes < 2) | uniform] = 0.0
+        self.line_mean = page_mean[page_ids]
+        self.line_std = page_std[page_ids]
+        self.font_sizes = font_sizes
+
+        # Last line of each page: the largest top, latest in reading order on ties
+        order = np.lexsort((np.arange(n), tops, page_ids))
+        last_rows = order[np.append(np.flatnonzero(np.diff(page_ids[order])), n - 1)] if n else order
+        text_array = np.empty(n, dtype=object)
+        text_array[:] = texts
+        self.is_last_text = text_array == text_array[last_rows][page_ids] if n else np.zeros(0, dtype=bool)
+
+        if header_counts is None:
+            text_codes, _ = pd.factorize(np.array([t.lower() for t in texts], dtype=object))
+            top_codes, top_uniques = pd.factorize(np.array([round(t, 1) for t in tops.tolist()]))
+            keys = text_codes.astype(np.int64) * max(len(top_uniques), 1) + top_codes
+            _, key_ids, key_counts = np.unique(keys, return_inverse=True, return_counts=True)
+            header_counts = key_counts[key_ids.reshape(-1)]
+        self.header_counts = np.asarray(header_counts, dtype=np.int64)
+
+        self.text_ok = (
+            (features["length"] <= 100)
+            & (features["num_words"] <= 15)
+            & np.array([sum(map(str.isalnum, t)) >= 3 for t in texts], dtype=bool)
+        )
+
+    def mask(self, z=0.25, header_repeats=3, remove_repetitive_headers=True):
+        keep = self.text_ok & ~self.is_last_text & (self.font_sizes >= self.line_mean + z * self.line_std)
+        if remove_repetitive_headers:
+            keep &= self.header_counts < header_repeats
+        return keep
+
+    def candidates(self, z=0.25, header_repeats=3, remove_repetitive_headers=True):
+        """The filtered and merged candidate lines for the given thresholds."""
+        kept = self.features.select(self.mask(z, header_repeats, remove_repetitive_headers))
+        return LineFeatures.from_frame(merge_similar_multiline_rows(kept.to_frame()))
+
+
+def filter_candidate_features(features, z=0.25, remove_repetitive_headers=True, header_repeats=3):
+    """Columnar filter_candidates over a LineFeatures store."""
+    if not len(features):
+        return LineFeatures.empty()
+    return CandidateStats(features).candidates(z, header_repeats, remove_repetitive_headers)
+
+
+def filter_candidates(lines, z=0.25, remove_repetitive_headers=True, header_repeats=3):
+    """Filter candidate heading lines; accepts line dicts or a LineFeatures, returns line dicts."""
+    features = lines if isinstance(lines, LineFeatures) else LineFeatures.from_records(lines)
+    return filter_candidate_features(features, z, remove_repetitive_headers, header_repeats).to_records()
+
+
+def stream_candidates(pdf_path, z=0.25, remove_repetitive_headers=True, pos_features=True, header_repeats=3):
+    """
+    Yield (page_index, candidates) one page at a time, where candidates is
+    the LineFeatures filter_candidate_features would keep for that page.
+    Only one page of features is alive at a time.
 
-            filtered.append(line)
+    Repeated headers are the one cross-page statistic: when they are
+    removed, a first layout-only pass counts hashed (text, top) keys,
+    which is the only per-document state kept. POS tagging runs on the
+    surviving candidates only.
+    """
+    header_counts = Counter()
+    if remove_repetitive_headers:
+        for _, page_features in iter_page_features(pdf_path):
+            header_counts.update(hash(k) for k in header_keys(page_features))
 
-    filtered_df = pd.DataFrame(filtered)
-    merged_df = merge_similar_multiline_rows(filtered_df)
-    return merged_df.to_dict(orient="records")
+    for page_index, page_features in iter_page_features(pdf_path):
+        if not len(page_features):
+            yield page_index, page_features
+            continue
+        page_counts = [header_counts[hash(k)] for k in header_keys(page_features)]
+        stats = CandidateStats(page_features, header_counts=page_counts)
+        kept = page_features.select(stats.mask(z, header_repeats, remove_repetitive_headers))
+        if pos_features:
+            fill_pos_features(kept)
+        merged_df = merge_similar_multiline_rows(kept.to_frame())
+        yield page_index, LineFeatures.from_frame(merged_df)
@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+
+# Key order of the line records written to *_raw.json
+RAW_KEYS = [
+    "text", "font_size", "bold", "length", "is_upper", "indent",
+    "line_top", "line_bottom", "spacing_before", "spacing_after",
+    "ends_with_colon", "is_short", "is_numbered", "first_page",
+    "page", "num_words", "num_verbs", "num_nouns", "num_adjectives",
+    "num_adverbs", "num_pronouns", "num_cardinals", "num_conjunctions",
+    "num_predeterminers", "num_interjections"
+]
+
+# Column order of the numeric matrix; same order as the models' FEATURE_KEYS
+NUMERIC_KEYS = [
+    "font_size", "bold", "spacing_before", "spacing_after",
+    "indent", "length", "is_upper", "line_top", "line_bottom",
+    "ends_with_colon", "is_short", "is_numbered", "first_page",
+    "page", "num_words", "num_verbs", "num_nouns", "num_adjectives",
+    "num_adverbs", "num_pronouns", "num_cardinals", "num_conjunctions",
+    "num_predeterminers", "num_interjections"
+]
+
+FLOAT_KEYS = {"font_size", "indent", "line_top", "line_bottom", "spacing_before", "spacing_after"}
+
+COLUMN_INDEX = {key: i for i, key in enumerate(NUMERIC_KEYS)}
+
+
+class LineFeatures:
+    """
+    Columnar store of line features: one float64 matrix with a column per
+    numeric feature (in NUMERIC_KEYS order) plus an object array of texts.
+    Columns are views into the matrix, and the matrix is what the models read.
+    """
+
+    def __init__(self, values, text):
+        self.values = values
+        self.text = text
+
+    @classmethod
+    def empty(cls):
+        return cls(np.empty((0, len(NUMERIC_KEYS)), dtype=np.float64), np.empty(0, dtype=object))
+
+    @classmethod
+    def from_rows(cls, rows, texts):
+        """Build from rows of numeric values in NUMERIC_KEYS order."""
+        if not texts:
+            return cls.empty()
+        text = np.empty(len(texts), dtype=object)
+        text[:] = texts
+        return cls(np.array(rows, dtype=np.float64), text)
+
+    @classmethod
+    def from_records(cls, records):
+        """Build from line dicts in the *_raw.json format."""
+        return cls.from_rows(
+            [[r.get(k, 0) for k in NUMERIC_KEYS] for r in records],
+            [r["text"] for r in records]
+        )
+
+    @classmethod
+    def from_frame(cls, df):
+        if df.empty:
+            return cls.empty()
+        return cls(df[NUMERIC_KEYS].to_numpy(dtype=np.float64), df["text"].to_numpy(dtype=object))
+
+    @classmethod
+    def concat(cls, parts):
+        parts = [p for p in parts if len(p)]
+        if not parts:
+            return cls.empty()
+        return cls(np.concatenate([p.values for p in parts]), np.concatenate([p.text for p in parts]))
+
+    def __len__(self):
+        return len(self.text)
+
+    def __getitem__(self, key):
+        if key == "text":
+            return self.text
+        return self.values[:, COLUMN_INDEX[key]]
+
+    def select(self, mask):
+        """Rows selected by a boolean mask or index array."""
+        return LineFeatures(self.values[mask], self.text[mask])
+
+    def matrix(self, keys):
+        """The (n_lines, len(keys)) feature matrix; no copy when keys is NUMERIC_KEYS."""
+        if list(keys) == NUMERIC_KEYS:
+            return self.values
+        return self.values[:, [COLUMN_INDEX[k] for k in keys]]
+
+    def column_list(self, key):
+        """A column as Python values: float for FLOAT_KEYS, int otherwise."""
+        if key == "text":
+            return self.text.tolist()
+        column = self[key]
+        return column.tolist() if key in FLOAT_KEYS else column.astype(np.int64).tolist()
+
+    def to_frame(self):
+        return pd.DataFrame({
+            key: self.text if key == "text"
+            else (self[key] if key in FLOAT_KEYS else self[key].astype(np.int64))
+            for key in RAW_KEYS
+        })
+
+    def to_records(self):
+        """Export to the *_raw.json line dict format."""
+        columns = [self.column_list(key) for key in RAW_KEYS]
+        return [dict(zip(RAW_KEYS, row)) for row in zip(*columns)]
@@ -2,6 +2,8 @@ import fitz  # PyMuPDF
 import os
 import json
 import joblib
+import numpy as np
+import parallel
 
 MODEL_PATH = "heading_model_mlp.joblib"
 SCALER_PATH = "scaler.joblib"
@@ -16,15 +18,22 @@ def extract_features(span, previous_top):
     spacing = round(abs(top - previous_top), 1)
     return [font_size, bold, top, spacing]
 
-def extract_headings(pdf_path, model, scaler):
-    doc = fitz.open(pdf_path)
-    outline = []
-    title = None
+def collect_span_features(doc):
+    """
+    Phase 1: walk every page once and write the [font_size, bold, top, spacing]
+    features of each kept span into per-page arrays, holding only one page's
+    text dict at a time.
+    Returns (features, texts, pages) with one row per kept span.
+    """
+    page_features = []
+    texts = []
 
     for page_num in range(len(doc)):
-        page = doc[page_num]
-        blocks = page.get_text("dict")["blocks"]
+        blocks = doc[page_num].get_text("dict")["blocks"]
+        max_spans = sum(len(line["spans"]) for b in blocks for line in b.get("lines", []))
+        features = np.empty((max_spans, 4), dtype=np.float64)
 
+        n = 0
         previous_top = 0
         for b in blocks:
             for line in b.get("lines", []):
@@ -33,23 +42,36 @@ def extract_headings(pdf_path, model, scaler):
                     if not text or len(text) < 3:
                         continue
 
-                    features = extract_features(span, previous_top)
-                    previous_top = round(span["bbox"][1], 1)
-
-                    scaled_features = scaler.transform([features])
-                    pred = model.predict(scaled_features)[0]
-                    if pred != "BODY":
-                        outline.append({
-                            "level": str(pred),         # Ensure it's a string like "H1"
-                            "text": str(text),          # Just to be safe
-                            "page": int(page_num + 1)   # Convert numpy.int64 → Python int
-                        })
+                    row = extract_features(span, previous_top)
+                    previous_top = row[2]
+                    features[n] = row
+                    texts.append(text)
+                    n += 1
+        page_features.append(features[:n])
 
+    pages = np.repeat(np.arange(len(page_features), dtype=np.int64), [len(f) for f in page_features])
+    features = np.concatenate(page_features) if page_features else np.empty((0, 4), dtype=np.float64)
+    return features, texts, pages
 
-                    # Detect title: first large bold text on page 1
-                    if page_num == 0 and not title:
-                        if features[0] >= 15 and features[1] == 1:
-                            title = text
+def extract_headings(pdf_path, model, scaler):
+    doc = fitz.open(pdf_path)
+    features, texts, pages = collect_span_features(doc)
+
+    # Phase 2: classify the whole document with one scaler/model call
+    preds = model.predict(scaler.transform(features)) if len(texts) else []
+    outline = [
+        {
+            "level": str(pred),         # Ensure it's a string like "H1"
+            "text": str(text),          # Just to be safe
+            "page": int(page_num + 1)   # Convert numpy.int64 → Python int
+        }
+        for pred, text, page_num in zip(preds, texts, pages)
+        if pred != "BODY"
+    ]
+
+    # Detect title: first large bold text on page 1
+    title_rows = np.flatnonzero((pages == 0) & (features[:, 0] >= 15) & (features[:, 1] == 1))
+    title = texts[title_rows[0]] if len(title_rows) else None
 
     return {
         "title": str(title or "Untitled"),
@@ -60,21 +82,28 @@ def save_json(data, output_path):
     with open(output_path, "w", encoding="utf-8") as f:
         json.dump(data, f, indent=2)
 
+_model = None
+_scaler = None
+
+def init_worker(model_path=MODEL_PATH, scaler_path=SCALER_PATH):
+    """Load the model and scaler once per process."""
+    global _model, _scaler
+    _model = joblib.load(model_path)
+    _scaler = joblib.load(scaler_path)
+
+def process_pdf(pdf_path):
+    return extract_headings(pdf_path, _model, _scaler)
+
 def main():
+    args = parallel.build_parser("Extract heading outlines from PDFs.").parse_args()
     input_dir = "/app/input" if os.getenv("DOCKER") == "true" else "./input"
     output_dir = "/app/output" if os.getenv("DOCKER") == "true" else "./output"
 
     os.makedirs(output_dir, exist_ok=True)
-    model = joblib.load(MODEL_PATH)
-    scaler = joblib.load(SCALER_PATH)
-
-    for filename in os.listdir(input_dir):
-        if not filename.endswith(".pdf"):
-            continue
-
-        pdf_path = os.path.join(input_dir, filename)
-        result = extract_headings(pdf_path, model, scaler)
 
+    pdf_paths = [os.path.join(input_dir, f) for f in parallel.list_pdfs(input_dir, ignore_case=False)]
+    for pdf_path, result in parallel.run(pdf_paths, process_pdf, args.workers, init_worker):
+        filename = os.path.basename(pdf_path)
         output_filename = filename.replace(".pdf", ".json")
         output_path = os.path.join(output_dir, output_filename)
         save_json(result, output_path)
@@ -1,11 +1,22 @@
 import os
 import json
+from functools import partial
 import joblib
-from extract_structure import extract_line_features_with_text_stats, filter_candidates
+from extract_structure import extract_line_features, filter_candidate_features, stream_candidates
 import numpy as np
+import parallel
 MODEL_PATH = "heading_model_lgbm.joblib"
 SCALER_PATH = "scaler.joblib"
 
+FEATURE_KEYS = [
+    "font_size", "bold", "spacing_before", "spacing_after",
+    "indent", "length", "is_upper", "line_top", "line_bottom", 
+    "ends_with_colon", "is_short", "is_numbered", "first_page",
+    "page", "num_words", "num_verbs", "num_nouns", "num_adjectives",
+    "num_adverbs", "num_pronouns", "num_cardinals", "num_conjunctions",
+    "num_predeterminers", "num_interjections"
+]
+
 
 class NumpyEncoder(json.JSONEncoder):
     def default(self, obj):
@@ -24,12 +35,16 @@ def save_json(data, output_path):
 
 
 
-def apply_model(lines, model, scaler, feature_keys):
+def build_feature_matrix(lines, feature_keys):
+    """Stack the feature values of all lines into one (n_lines, n_features) array."""
+    return np.array(
+        [[line.get(k, 0) for k in feature_keys] for line in lines],
+        dtype=np.float64
+    ).reshape(len(lines), len(feature_keys))
+
+def outline_from_predictions(lines, preds):
     outline = []
-    for line in lines:
-        features = [line.get(k, 0) for k in feature_keys]
-        scaled = scaler.transform([features])
-        pred = model.predict(scaled)[0]
+    for line, pred in zip(lines, preds):
         if pred != "BODY":
             outline.append({
                 "level": pred,
@@ -38,55 +53,97 @@ def apply_model(lines, model, scaler, feature_keys):
             })
     return outline
 
-def main():
-    input_dir = "/app/input" if os.getenv("DOCKER") == "true" else "./input"
-    output_dir = "/app/test_output" if os.getenv("DOCKER") == "true" else "./test_output"
-    os.makedirs(output_dir, exist_ok=True)
-
-    model = joblib.load(MODEL_PATH)
-    scaler = joblib.load(SCALER_PATH)
-    feature_keys = [
-        "font_size", "bold", "spacing_before", "spacing_after",
-        "indent", "length", "is_upper", "line_top", "line_bottom", 
-        "ends_with_colon", "is_short", "is_numbered", "first_page",
-        "page", "num_words", "num_verbs", "num_nouns", "num_adjectives",
-        "num_adverbs", "num_pronouns", "num_cardinals", "num_conjunctions",
-        "num_predeterminers", "num_interjections"
+def apply_model(lines, model, scaler, feature_keys):
+    """Classify every candidate line with a single scaler and model call."""
+    if not lines:
+        return []
+    X = build_feature_matrix(lines, feature_keys)
+    preds = model.predict(scaler.transform(X))
+    return outline_from_predictions(lines, preds)
+
+def apply_model_features(features, model, scaler, feature_keys=FEATURE_KEYS):
+    """
+    Classify the lines of a LineFeatures store. With the default FEATURE_KEYS
+    the model reads the store's matrix directly, without building a copy.
+    """
+    if not len(features):
+        return []
+    preds = model.predict(scaler.transform(features.matrix(feature_keys)))
+    return [
+        {"level": pred, "text": text, "page": page}
+        for pred, text, page in zip(preds, features.text.tolist(), features.column_list("page"))
+        if pred != "BODY"
     ]
 
-    for filename in os.listdir(input_dir):
-        if not filename.lower().endswith(".pdf"):
-            continue
-
-        pdf_path = os.path.join(input_dir, filename)
-        lines = extract_line_features_with_text_stats(pdf_path)
-        filtered_lines = filter_candidates(lines)
-
-        outline_raw = apply_model(filtered_lines, model, scaler, feature_keys)
+def apply_model_batch(docs_lines, model, scaler, feature_keys):
+    """
+    Classify the candidate lines of several documents in one call.
+    Returns one outline per document, in the same order as docs_lines.
+    """
+    all_lines = [line for lines in docs_lines for line in lines]
+    if not all_lines:
+        return [[] for _ in docs_lines]
+    X = build_feature_matrix(all_lines, feature_keys)
+    preds = model.predict(scaler.transform(X))
+    splits = np.cumsum([len(lines) for lines in docs_lines])[:-1]
+    return [
+        outline_from_predictions(lines, doc_preds)
+        for lines, doc_preds in zip(docs_lines, np.split(preds, splits))
+    ]
 
-        outline = []
-        for line in outline_raw:
-            level = line["level"]
-            if isinstance(level, int) or (isinstance(level, str) and level.isdigit()):
-                level_str = f"H{int(level)+1}"
-            else:
-                level_str = str(level)
-            outline.append({
-                "level": level_str,
-                "text": line["text"],
-                "page": line["page"]
-            })
+_model = None
+_scaler = None
+
+def init_worker(model_path=MODEL_PATH, scaler_path=SCALER_PATH):
+    """Load the model and scaler once per process."""
+    global _model, _scaler
+    _model = joblib.load(model_path)
+    _scaler = joblib.load(scaler_path)
+
+def process_pdf(pdf_path, pos_features=True, stream=False):
+    if stream:
+        outline_raw = []
+        for _, page_candidates in stream_candidates(pdf_path, pos_features=pos_features):
+            outline_raw.extend(apply_model_features(page_candidates, _model, _scaler))
+    else:
+        features = extract_line_features(pdf_path, pos_features=pos_features)
+        candidates = filter_candidate_features(features)
+        outline_raw = apply_model_features(candidates, _model, _scaler)
 
-        title_line = next((l for l in outline if l["level"] == "H1" and l["page"] == 0), None)
-        title = title_line["text"] if title_line else ""
-        if title_line:
-            outline = [l for l in outline if l != title_line]
+    outline = []
+    for line in outline_raw:
+        level = line["level"]
+        if isinstance(level, int) or (isinstance(level, str) and level.isdigit()):
+            level_str = f"H{int(level)+1}"
+        else:
+            level_str = str(level)
+        outline.append({
+            "level": level_str,
+            "text": line["text"],
+            "page": line["page"]
+        })
+
+    title_line = next((l for l in outline if l["level"] == "H1" and l["page"] == 0), None)
+    title = title_line["text"] if title_line else ""
+    if title_line:
+        outline = [l for l in outline if l != title_line]
+
+    return {
+        "title": title,
+        "outline": outline
+    }
 
-        result = {
-            "title": title,
-            "outline": outline
-        }
+def main():
+    parser = parallel.add_fast_option(parallel.build_parser("Extract heading outlines from PDFs with the LightGBM model."))
+    args = parallel.add_stream_option(parser).parse_args()
+    process = partial(process_pdf, pos_features=not args.fast, stream=args.stream)
+    input_dir = "/app/input" if os.getenv("DOCKER") == "true" else "./input"
+    output_dir = "/app/test_output" if os.getenv("DOCKER") == "true" else "./test_output"
+    os.makedirs(output_dir, exist_ok=True)
 
+    pdf_paths = [os.path.join(input_dir, f) for f in parallel.list_pdfs(input_dir)]
+    for pdf_path, result in parallel.run(pdf_paths, process, args.workers, init_worker):
+        filename = os.path.basename(pdf_path)
         output_filename = filename.replace(".pdf", ".json")
         output_path = os.path.join(output_dir, output_filename)
         save_json(result, output_path)
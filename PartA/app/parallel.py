@@ -0,0 +1,49 @@
+import os
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+
+def build_parser(description):
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of worker processes (default: 1, no pool)")
+    return parser
+
+def add_fast_option(parser):
+    parser.add_argument("--fast", action="store_true",
+                        help="skip POS tagging; the num_verbs/num_nouns/... features are read as 0")
+    return parser
+
+def add_stream_option(parser):
+    parser.add_argument("--stream", action="store_true",
+                        help="extract and filter one page at a time to bound memory on long documents")
+    return parser
+
+def list_pdfs(input_dir, ignore_case=True):
+    """Return the PDF filenames in input_dir, in os.listdir order."""
+    filenames = []
+    for filename in os.listdir(input_dir):
+        name = filename.lower() if ignore_case else filename
+        if name.endswith(".pdf"):
+            filenames.append(filename)
+    return filenames
+
+def run(paths, process_one, workers=1, initializer=None, initargs=()):
+    """
+    Apply process_one to every path and yield (path, result) pairs as each
+    one finishes. With workers > 1 the paths are spread across a process
+    pool; initializer runs once per worker process (once in-process when
+    workers <= 1), so expensive state such as joblib models is loaded a
+    single time per process rather than once per file.
+    """
+    if workers <= 1:
+        if initializer is not None:
+            initializer(*initargs)
+        for path in paths:
+            yield path, process_one(path)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as pool:
+        futures = {pool.submit(process_one, path): path for path in paths}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
@@ -0,0 +1,123 @@
+"""
+Original (pre-vectorization) implementations and synthetic inputs, shared by
+the regression tests and the bench_* scripts.
+"""
+from collections import defaultdict
+from statistics import mean, stdev
+import numpy as np
+import pandas as pd
+from extract_structure import MERGE_KEYS, merge_similar_multiline_rows
+
+
+def merge_rows_reference(df):
+    """The original row-by-row merge, kept as the regression reference."""
+    if df.empty:
+        return df
+
+    df = df.sort_values(by=["page", "line_top"]).reset_index(drop=True)
+    merged_rows = []
+    current = df.iloc[0].to_dict()
+
+    for i in range(1, len(df)):
+        row = df.iloc[i]
+        if all(current.get(k) == row[k] for k in MERGE_KEYS):
+            current["text"] += " " + row["text"]
+            current["length"] += row["length"]
+            current["num_words"] += row["num_words"]
+            current["line_top"] = min(current["line_top"], row["line_top"])
+            current["line_bottom"] = max(current["line_bottom"], row["line_bottom"])
+        else:
+            merged_rows.append(current)
+            current = row.to_dict()
+
+    merged_rows.append(current)
+    return pd.DataFrame(merged_rows)
+
+
+def synthetic_lines(n, seed=0):
+    rng = np.random.default_rng(seed)
+    page = np.sort(rng.integers(0, max(n // 40, 1), n))
+    top = np.round(rng.uniform(0, 800, n), 1)
+    return pd.DataFrame({
+        "text": [f"line {i}" for i in range(n)],
+        "font_size": rng.choice([10.0, 12.0, 14.5], n, p=[0.2, 0.2, 0.6]),
+        "bold": rng.choice([0, 1], n, p=[0.2, 0.8]),
+        "length": rng.integers(3, 100, n),
+        "is_upper": np.zeros(n, dtype=int),
+        "line_top": top,
+        "line_bottom": top + 12.0,
+        "ends_with_colon": rng.choice([0, 1], n, p=[0.9, 0.1]),
+        "is_short": np.ones(n, dtype=int),
+        "is_numbered": np.zeros(n, dtype=int),
+        "first_page": (page == 0).astype(int),
+        "page": page,
+        "num_words": rng.integers(1, 15, n),
+    })
+
+
+def filter_candidates_reference(lines, z=0.25, remove_repetitive_headers=True, header_repeats=3):
+    """The original per-page Python filter, kept as the regression reference."""
+    lines_by_page = defaultdict(list)
+    for line in lines:
+        lines_by_page[line["page"]].append(line)
+
+    text_position_counts = defaultdict(int)
+    for line in lines:
+        text_position_counts[(line["text"].strip().lower(), round(line["line_top"], 1))] += 1
+
+    filtered = []
+    for page, page_lines in lines_by_page.items():
+        font_sizes = [l["font_size"] for l in page_lines]
+        mu = mean(font_sizes)
+        sigma = stdev(font_sizes) if len(font_sizes) > 1 else 0
+        font_threshold = mu + z * sigma
+        last_line = sorted(page_lines, key=lambda x: x["line_top"])[-1]["text"].strip()
+
+        for line in page_lines:
+            text = line["text"].strip()
+            key = (text.lower(), round(line["line_top"], 1))
+            if text == last_line:
+                continue
+            if remove_repetitive_headers and text_position_counts[key] >= header_repeats:
+                continue
+            if sum(c.isalnum() for c in text) < 3:
+                continue
+            if len(text) > 100 or len(text.split()) > 15:
+                continue
+            if line["font_size"] < font_threshold:
+                continue
+            filtered.append(line)
+
+    return merge_similar_multiline_rows(pd.DataFrame(filtered)).to_dict(orient="records")
+
+
+def synthetic_pages(n_pages, lines_per_page=40, seed=0):
+    """Line dicts shaped like extraction output, with a running header and footer."""
+    rng = np.random.default_rng(seed)
+    words = ["alpha", "beta", "gamma", "delta", "Results", "Overview", "1.2", "--", "x"]
+    lines = []
+    for page in range(n_pages):
+        tops = np.sort(np.round(rng.uniform(60, 760, lines_per_page), 2))
+        sizes = rng.choice([9.96, 10.0, 12.0, 14.04, 18.0], lines_per_page, p=[0.5, 0.2, 0.15, 0.1, 0.05])
+        if page % 7 == 3:
+            sizes[:] = 10.0
+        page_lines = [("Annual Report 2024", 20.0, 10.0)]
+        for top, size in zip(tops, sizes):
+            n_words = int(rng.integers(1, 20))
+            text = " ".join(rng.choice(words, n_words))
+            page_lines.append((text, float(top), float(size)))
+        page_lines.append((f"Page {page + 1}", 780.0, 9.0))
+
+        for text, top, size in page_lines:
+            lines.append({
+                "text": text, "font_size": size, "bold": int(rng.random() < 0.3),
+                "length": len(text), "is_upper": int(text.isupper()), "indent": 72.0,
+                "line_top": top, "line_bottom": top + size,
+                "spacing_before": 4.0, "spacing_after": 4.0,
+                "ends_with_colon": int(text.endswith(":")), "is_short": int(len(text.split()) <= 8),
+                "is_numbered": int(text[:1].isdigit()), "first_page": int(page == 0), "page": page,
+                "num_words": len(text.split()), "num_verbs": 0, "num_nouns": 0, "num_adjectives": 0,
+                "num_adverbs": 0, "num_pronouns": 0, "num_cardinals": 0, "num_conjunctions": 0,
+                "num_predeterminers": 0, "num_interjections": 0,
+            })
+    return lines
@@ -0,0 +1,30 @@
+import pytest
+from extract_structure import CandidateStats, filter_candidates
+from line_features import LineFeatures
+from reference_impl import filter_candidates_reference, synthetic_pages
+
+
+@pytest.mark.parametrize("z", [0.0, 0.25, 1.0])
+@pytest.mark.parametrize("remove_repetitive_headers", [True, False])
+def test_matches_reference(z, remove_repetitive_headers):
+    lines = synthetic_pages(30, seed=1)
+    expected = filter_candidates_reference(lines, z, remove_repetitive_headers)
+    assert filter_candidates(lines, z, remove_repetitive_headers) == expected
+
+
+def test_thresholds_reuse_precomputed_stats():
+    lines = synthetic_pages(20, seed=2)
+    stats = CandidateStats(LineFeatures.from_records(lines))
+    for z in (0.0, 0.5):
+        for header_repeats in (2, 3, 50):
+            expected = filter_candidates_reference(lines, z, header_repeats=header_repeats)
+            assert stats.candidates(z, header_repeats).to_records() == expected
+
+
+def test_pages_with_only_header_and_footer():
+    lines = synthetic_pages(5, lines_per_page=0, seed=3)
+    assert filter_candidates(lines) == filter_candidates_reference(lines)
+
+
+def test_empty_input():
+    assert filter_candidates([]) == []
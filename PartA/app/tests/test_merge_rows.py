@@ -0,0 +1,25 @@
+import numpy as np
+import pandas as pd
+import pytest
+from extract_structure import merge_similar_multiline_rows
+from reference_impl import merge_rows_reference, synthetic_lines
+
+
+def as_records(df):
+    return df.to_dict(orient="records")
+
+
+@pytest.mark.parametrize("n,seed", [(1, 0), (2, 1), (50, 2), (2000, 3)])
+def test_matches_reference(n, seed):
+    df = synthetic_lines(n, seed)
+    assert as_records(merge_similar_multiline_rows(df)) == as_records(merge_rows_reference(df))
+
+
+def test_tied_tops_keep_input_order():
+    df = synthetic_lines(300, 4)
+    df["line_top"] = np.round(df["line_top"] / 100) * 100
+    assert as_records(merge_similar_multiline_rows(df)) == as_records(merge_rows_reference(df))
+
+
+def test_empty_frame():
+    assert merge_similar_multiline_rows(pd.DataFrame()).empty
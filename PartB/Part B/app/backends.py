@@ -0,0 +1,163 @@
+from pathlib import Path
+import argparse
+import re
+import numpy as np
+
+# Inference backends for the embedding and summary models:
+#   torch      fp32 PyTorch (the original path)
+#   int8       PyTorch with dynamic int8 quantization of every nn.Linear
+#   onnx       ONNX Runtime on an fp32 export (see export() below)
+#   onnx-int8  ONNX Runtime on the same export, dynamically quantized to int8
+#
+# embed.py and summarise.py pick their backend per model (PDI_EMBED_BACKEND,
+# PDI_SUMMARY_BACKEND) and load the model from PDI_EMBED_MODEL or
+# PDI_SUMMARY_MODEL: a hub name or local directory, or for onnx* the export
+# directory written by export().
+BACKENDS = ("torch", "int8", "onnx", "onnx-int8")
+DEFAULT_BACKEND = "torch"
+
+QUANTIZED_SUFFIX = "_quantized"
+
+def check(backend: str) -> str:
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown inference backend {backend!r}, expected one of {', '.join(BACKENDS)}")
+    return backend
+
+def is_onnx(backend: str) -> bool:
+    return check(backend).startswith("onnx")
+
+def onnx_file(stem: str, backend: str) -> str:
+    return f"{stem}{QUANTIZED_SUFFIX if backend == 'onnx-int8' else ''}.onnx"
+
+def quantize_int8(model):
+    """
+    Copy of a torch model with its Linear layers quantized to int8 (weights
+    ahead of time, activations per batch). No calibration data needed.
+    """
+    import torch
+
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+class OnnxEncoder:
+    """
+    Sentence encoder over an ONNX export of a BERT-style model: runs the
+    transformer in ONNX Runtime, then mean-pools the token states like
+    sentence-transformers does. encode() takes the same arguments as
+    SentenceTransformer.encode, so embed.py can use either.
+    """
+
+    def __init__(self, directory: Path, backend: str = "onnx", max_length: int = 256):
+        import onnxruntime
+        from transformers import AutoTokenizer
+
+        directory = Path(directory)
+        self.tokenizer = AutoTokenizer.from_pretrained(directory)
+        self.session = onnxruntime.InferenceSession(str(directory / onnx_file("model", backend)),
+                                                    providers=["CPUExecutionProvider"])
+        self.input_names = [i.name for i in self.session.get_inputs()]
+        self.max_length = max_length
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.session.get_outputs()[0].shape[-1]
+
+    def encode(self, texts, normalize_embeddings: bool = True, batch_size: int = 64,
+               show_progress_bar: bool = False) -> np.ndarray:
+        chunks = []
+        for start in range(0, len(texts), batch_size):
+            inputs = self.tokenizer(texts[start:start + batch_size], padding=True, truncation=True,
+                                    max_length=self.max_length, return_tensors="np")
+            hidden = self.session.run(None, {name: inputs[name].astype(np.int64) for name in self.input_names})[0]
+            mask = inputs["attention_mask"][..., None].astype(np.float32)
+            chunks.append((hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9))
+        if not chunks:
+            return np.empty((0, self.get_sentence_embedding_dimension()), dtype=np.float32)
+
+        vectors = np.concatenate(chunks).astype(np.float32)
+        if normalize_embeddings:
+            vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        return vectors
+
+def load_onnx_seq2seq(directory: Path, backend: str = "onnx"):
+    """
+    (tokenizer, model) for an ONNX seq2seq export; the model has the same
+    generate() as the transformers one.
+    """
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    from transformers import AutoTokenizer
+
+    model = ORTModelForSeq2SeqLM.from_pretrained(
+        directory,
+        encoder_file_name=onnx_file("encoder_model", backend),
+        decoder_file_name=onnx_file("decoder_model", backend),
+        decoder_with_past_file_name=onnx_file("decoder_with_past_model", backend),
+    )
+    return AutoTokenizer.from_pretrained(directory), model
+
+# optimum export task per model kind
+EXPORT_TASKS = {
+    "embed": "feature-extraction",
+    "summary": "text2text-generation-with-past",
+}
+
+def export(kind: str, model_name: str, directory: Path, quantize: bool = True) -> list[Path]:
+    """
+    Export model_name to ONNX files (plus tokenizer) in directory, and with
+    quantize also a dynamically quantized *_quantized.onnx next to each
+    file, so both "onnx" and "onnx-int8" load from the same directory.
+    Returns the written .onnx files.
+    """
+    from optimum.exporters.onnx import main_export
+
+    directory = Path(directory)
+    main_export(model_name, output=directory, task=EXPORT_TASKS[kind], library_name="transformers")
+    files = sorted(p for p in directory.glob("*.onnx") if not p.stem.endswith(QUANTIZED_SUFFIX))
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        for path in list(files):
+            quantized = path.with_name(path.stem + QUANTIZED_SUFFIX + path.suffix)
+            quantize_dynamic(path, quantized, weight_type=QuantType.QInt8)
+            files.append(quantized)
+    return files
+
+def cosine_parity(reference: np.ndarray, candidate: np.ndarray) -> np.ndarray:
+    """
+    Row-wise cosine similarity between two embedding matrices of the same texts.
+    """
+    reference = np.asarray(reference, dtype=np.float64)
+    candidate = np.asarray(candidate, dtype=np.float64)
+    norms = np.linalg.norm(reference, axis=1) * np.linalg.norm(candidate, axis=1)
+    return (reference * candidate).sum(axis=1) / np.maximum(norms, 1e-12)
+
+def summary_overlap(reference: str, candidate: str) -> float:
+    """
+    Unigram F1 between two summaries (ROUGE-1 F without stemming).
+    """
+    ref = re.findall(r"\w+", reference.lower())
+    cand = re.findall(r"\w+", candidate.lower())
+    if not ref or not cand:
+        return float(ref == cand)
+    common = sum(min(ref.count(w), cand.count(w)) for w in set(cand))
+    if not common:
+        return 0.0
+    precision, recall = common / len(cand), common / len(ref)
+    return 2 * precision * recall / (precision + recall)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.backends",
+                                     description="Export the embedding or summary model for the ONNX backends.")
+    parser.add_argument("kind", choices=sorted(EXPORT_TASKS))
+    parser.add_argument("directory", type=Path, help="where the ONNX files and tokenizer are written")
+    parser.add_argument("--model", default=None,
+                        help="model name or local path (default: the one embed.py/summarise.py use)")
+    parser.add_argument("--no-quantize", action="store_true", help="skip the int8 *_quantized.onnx files")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.model is None:
+        from . import embed, summarise
+
+        args.model = {"embed": embed.MODEL_NAME, "summary": summarise.MODEL_NAME}[args.kind]
+    for path in export(args.kind, args.model, args.directory, quantize=not args.no_quantize):
+        print(path)
@@ -0,0 +1,138 @@
+from pathlib import Path
+import argparse
+import copy
+import glob
+import json
+import numpy as np
+from . import loader, utils, embed, rank, summarise
+from .cache import file_digest
+from .main import add_pipeline_options, extract_sections, rank_documents, write_output
+
+def resolve_collections(patterns) -> list[Path]:
+    """
+    Expand collection paths and globs, keeping directories that hold a
+    challenge1b_input.json, in order and without repeats.
+    """
+    collections = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(str(pattern))) if glob.has_magic(str(pattern)) else [pattern]
+        for match in map(Path, matches):
+            if (match / "challenge1b_input.json").is_file() and match not in collections:
+                collections.append(match)
+    return collections
+
+def plan_collections(collections, loader_backend: str = loader.DEFAULT_BACKEND):
+    """
+    Extract the sections of every distinct PDF (by content hash) once.
+    Returns (plans, unique): one (collection, persona_text, [(pdf_file,
+    digest)]) plan per collection, and digest -> sections.
+    """
+    plans = []
+    unique = {}
+    for collection in collections:
+        persona, job = utils.load_persona(collection / "challenge1b_input.json")
+        pdfs = []
+        for pdf_file in (collection / "PDFs").glob("*.pdf"):
+            digest = file_digest(pdf_file)
+            if digest not in unique:
+                unique[digest] = extract_sections(pdf_file, loader_backend)
+            if unique[digest]:
+                pdfs.append((pdf_file, digest))
+        plans.append((collection, f"{persona} {job}", pdfs))
+    return plans, unique
+
+def summarise_unique(sections, batch_size: int = summarise.DEFAULT_BATCH_SIZE) -> int:
+    """
+    Summarise each distinct section text once and share the result with
+    every section carrying that text. Returns the number of summaries run.
+    """
+    representatives = {}
+    for section in sections:
+        representatives.setdefault(section["text"], section)
+    summarise.refine_batch(list(representatives.values()), batch_size=batch_size)
+    for section in sections:
+        section["subsection"] = dict(representatives[section["text"]]["subsection"])
+    return len(representatives)
+
+def run(collections, output_root: Path, loader_backend: str = loader.DEFAULT_BACKEND,
+        summary_batch_size: int = summarise.DEFAULT_BATCH_SIZE,
+        top_k: int = rank.DEFAULT_TOP_K) -> dict:
+    """
+    Process many collections in one go, parsing, sectioning and embedding
+    PDFs shared between collections only once. Each collection's output is
+    written to output_root/<collection name>/. Returns a report of the work
+    done and saved by deduplication.
+    """
+    names = [collection.name for collection in collections]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Collection names must be unique to name their output directories: {names}")
+    timings = {}
+
+    with utils.timed(timings, "extract"):
+        plans, unique = plan_collections(collections, loader_backend)
+
+    # Every distinct section plus every persona query in one encode call
+    offsets = {}
+    texts = []
+    for digest, sections in unique.items():
+        offsets[digest] = len(texts)
+        texts.extend(s["text"] for s in sections)
+    with utils.timed(timings, "embed"):
+        vectors = embed.encode(texts + [rank.query_text(persona_text) for _, persona_text, _ in plans])
+
+    selected = []
+    with utils.timed(timings, "rank"):
+        for i, (collection, persona_text, pdfs) in enumerate(plans):
+            # Ranking annotates sections, so each collection gets its own copies
+            documents = [(pdf_file, copy.deepcopy(unique[digest])) for pdf_file, digest in pdfs]
+            rows = [np.arange(offsets[d], offsets[d] + len(unique[d])) for _, d in pdfs]
+            rows = np.concatenate(rows) if rows else np.empty(0, dtype=np.int64)
+            query_vec = vectors[len(texts) + i]
+            selected.append(rank_documents(documents, vectors[rows], query_vec, persona_text, top_k))
+
+    with utils.timed(timings, "summarise"):
+        summaries = summarise_unique([s for sections in selected for s in sections],
+                                     batch_size=summary_batch_size)
+
+    outputs = []
+    with utils.timed(timings, "output"):
+        for (collection, _, _), all_sections in zip(plans, selected):
+            output_dir = Path(output_root) / collection.name
+            output_dir.mkdir(parents=True, exist_ok=True)
+            write_output(collection, output_dir, all_sections)
+            outputs.append(str(output_dir / "challenge1b_output.json"))
+
+    pdf_references = sum(len(pdfs) for _, _, pdfs in plans)
+    sections_referenced = sum(len(unique[d]) for _, _, pdfs in plans for _, d in pdfs)
+    summaries_requested = sum(map(len, selected))
+    return {
+        "collections": len(plans),
+        "pdfs": {"referenced": pdf_references, "parsed": len(unique),
+                 "saved": pdf_references - len(unique)},
+        "sections": {"referenced": sections_referenced, "embedded": len(texts),
+                     "saved": sections_referenced - len(texts)},
+        "summaries": {"requested": summaries_requested, "generated": summaries,
+                      "saved": summaries_requested - summaries},
+        "timings": timings,
+        "outputs": outputs,
+    }
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.batch",
+                                     description="Process many collections, sharing work across them.")
+    parser.add_argument("collections", nargs="+",
+                        help="collection directories or globs, e.g. 'Challenge_1b/Collection *'")
+    parser.add_argument("--output-root", type=Path, required=True,
+                        help="one output directory per collection is created here")
+    add_pipeline_options(parser)
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args()
+    summarise.set_threads(args.threads)
+    collections = resolve_collections(args.collections)
+    report = run(collections, args.output_root, loader_backend=args.loader,
+                 summary_batch_size=args.summary_batch_size, top_k=args.top_k)
+    args.output_root.mkdir(parents=True, exist_ok=True)
+    (args.output_root / "batch_report.json").write_text(json.dumps(report, indent=2))
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,151 @@
+from collections import Counter
+from pathlib import Path
+import hashlib
+import os
+import re
+import tempfile
+import zipfile
+import numpy as np
+from .cache import DiskCache
+
+# Bump whenever tokenization or the saved layout changes, so old indexes miss
+BM25_VERSION = 2
+
+# Unicode word characters, so accented terms ("crème") stay whole
+TOKEN_PATTERN = re.compile(r"\w+")
+
+def tokenize(text: str) -> list[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+class BM25Index:
+    """
+    Okapi BM25 over an inverted index.
+    Postings are stored CSR-style: the documents containing term t are
+    docs[indptr[t]:indptr[t + 1]], with their term frequencies at the same
+    positions in tfs. Scoring a query only reads the postings of its terms.
+    """
+
+    def __init__(self, vocab: dict, indptr: np.ndarray, docs: np.ndarray, tfs: np.ndarray,
+                 doc_lengths: np.ndarray, k1: float = 1.5, b: float = 0.75):
+        self.vocab = vocab
+        self.indptr = indptr
+        self.docs = docs
+        self.tfs = tfs
+        self.doc_lengths = doc_lengths
+        self.k1 = k1
+        self.b = b
+        n = len(doc_lengths)
+        df = np.diff(indptr)
+        self.idf = np.log1p((n - df + 0.5) / (df + 0.5))
+        self.avgdl = float(doc_lengths.mean()) if n and doc_lengths.any() else 1.0
+
+    def __len__(self):
+        return len(self.doc_lengths)
+
+    @classmethod
+    def build(cls, texts: list[str], k1: float = 1.5, b: float = 0.75):
+        vocab = {}
+        term_ids, doc_ids, tfs = [], [], []
+        doc_lengths = np.zeros(len(texts), dtype=np.float32)
+        for doc, text in enumerate(texts):
+            tokens = tokenize(text)
+            doc_lengths[doc] = len(tokens)
+            for term, tf in Counter(tokens).items():
+                term_ids.append(vocab.setdefault(term, len(vocab)))
+                doc_ids.append(doc)
+                tfs.append(tf)
+
+        term_ids = np.array(term_ids, dtype=np.int64)
+        # Stable sort keeps each posting list in document order
+        order = np.argsort(term_ids, kind="stable")
+        indptr = np.zeros(len(vocab) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum(np.bincount(term_ids, minlength=len(vocab)))
+        return cls(
+            vocab,
+            indptr,
+            np.array(doc_ids, dtype=np.int32)[order],
+            np.array(tfs, dtype=np.float32)[order],
+            doc_lengths,
+            k1=k1,
+            b=b,
+        )
+
+    def score(self, query: str) -> np.ndarray:
+        """
+        BM25 score of every document for the query.
+        """
+        scores = np.zeros(len(self), dtype=np.float64)
+        for term, qtf in Counter(tokenize(query)).items():
+            t = self.vocab.get(term)
+            if t is None:
+                continue
+            start, end = self.indptr[t], self.indptr[t + 1]
+            docs = self.docs[start:end]
+            tf = self.tfs[start:end]
+            norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[docs] / self.avgdl)
+            scores[docs] += qtf * self.idf[t] * tf * (self.k1 + 1) / (tf + norm)
+        return scores
+
+    def save(self, path: Path) -> None:
+        """
+        Write the index as a single .npz (no pickles), atomically.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-", suffix=".npz")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(
+                    f,
+                    terms=np.array(list(self.vocab), dtype=str),
+                    indptr=self.indptr,
+                    docs=self.docs,
+                    tfs=self.tfs,
+                    doc_lengths=self.doc_lengths,
+                    params=np.array([self.k1, self.b]),
+                )
+            os.replace(tmp_path, path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+    @classmethod
+    def load(cls, path: Path):
+        with np.load(path, allow_pickle=False) as data:
+            vocab = {term: i for i, term in enumerate(data["terms"].tolist())}
+            k1, b = data["params"].tolist()
+            return cls(vocab, data["indptr"], data["docs"], data["tfs"], data["doc_lengths"], k1=k1, b=b)
+
+def corpus_key(texts: list[str]) -> str:
+    digest = hashlib.sha256(f"bm25-v{BM25_VERSION}\0".encode())
+    for text in texts:
+        digest.update(text.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+# Only DiskCache's paths and LRU eviction are used: entries are BM25Index.save .npz files
+cache = DiskCache(
+    Path(os.environ.get("PDI_CACHE_DIR", "/tmp/pdi-cache")) / "bm25",
+    max_bytes=int(os.environ.get("PDI_CACHE_MAX_MB", "512")) * 1024 * 1024,
+    suffix=".npz",
+)
+
+def load_or_build(texts: list[str], directory: Path = None) -> BM25Index:
+    """
+    BM25 index for this exact list of texts, built once and persisted under
+    directory (default $PDI_CACHE_DIR/bm25), keyed by a hash of the texts.
+    The directory is capped at $PDI_CACHE_MAX_MB like the parse cache.
+    """
+    store = cache if directory is None else DiskCache(directory, max_bytes=cache.max_bytes, suffix=".npz")
+    path = store.path_for(corpus_key(texts))
+    try:
+        index = BM25Index.load(path)
+        os.utime(path)  # mark as recently used
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+        store.misses += 1
+        index = BM25Index.build(texts)
+        index.save(path)
+        store.evict()
+        return index
+    store.hits += 1
+    return index
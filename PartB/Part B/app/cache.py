@@ -0,0 +1,97 @@
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+
+
+def file_digest(path: Path, chunk_size: int = 1 << 20) -> str:
+    """
+    SHA-256 of a file's contents.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DiskCache:
+    """
+    Content-addressed on-disk cache of joblib pickles.
+    Entries are written atomically (temp file + rename) so concurrent
+    workers never see a partial entry, and the least recently used
+    entries are evicted once the directory grows past max_bytes.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int = 512 * 1024 * 1024, suffix: str = ".pkl"):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self.hits = 0
+        self.misses = 0
+
+    def path_for(self, key: str) -> Path:
+        return self.directory / f"{key}{self.suffix}"
+
+    def get(self, key: str):
+        """
+        Return the cached value for key, or None on a miss.
+        """
+        import joblib
+
+        path = self.path_for(key)
+        try:
+            value = joblib.load(path)
+            os.utime(path)  # mark as recently used
+        except OSError:
+            # Missing, evicted concurrently, or unreadable: treat as a miss
+            self.misses += 1
+            return None
+        except Exception:
+            # Truncated or corrupt. Unpickling bad bytes raises UnpicklingError,
+            # EOFError, ValueError, KeyError, IndexError, struct.error, ...
+            # Drop the entry so the value is recomputed and rewritten.
+            path.unlink(missing_ok=True)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value) -> None:
+        import joblib
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-", suffix=self.suffix)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                joblib.dump(value, f)
+            os.replace(tmp_path, self.path_for(key))
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+        self.evict()
+
+    def evict(self) -> None:
+        """
+        Delete least recently used entries until the cache fits in max_bytes.
+        """
+        entries = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if entry.name.startswith(".tmp-") or not entry.name.endswith(self.suffix):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            Path(path).unlink(missing_ok=True)
+            total -= size
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses}
@@ -0,0 +1,261 @@
+from pathlib import Path
+import argparse
+import json
+import os
+import sys
+import faiss
+import numpy as np
+from .cache import file_digest
+from . import loader
+
+# Index type by corpus size: exact search while it is cheap, then IVF, then HNSW
+FLAT_MAX = 20_000
+IVF_MAX = 1_000_000
+HNSW_NEIGHBOURS = 32
+
+def index_kind(n: int) -> str:
+    if n < FLAT_MAX:
+        return "flat"
+    if n < IVF_MAX:
+        return "ivf"
+    return "hnsw"
+
+def build_faiss_index(vectors: np.ndarray, ids: np.ndarray, kind: str):
+    """
+    Inner-product index over L2-normalised vectors (i.e. cosine similarity).
+    """
+    dim = vectors.shape[1]
+    if kind == "flat":
+        index = faiss.IndexIDMap2(faiss.IndexFlatIP(dim))
+    elif kind == "ivf":
+        nlist = max(1, int(4 * np.sqrt(len(vectors))))
+        index = faiss.IndexIVFFlat(faiss.IndexFlatIP(dim), dim, nlist, faiss.METRIC_INNER_PRODUCT)
+        index.train(vectors)
+        index.nprobe = max(1, nlist // 16)
+    else:
+        index = faiss.IndexIDMap2(faiss.IndexHNSWFlat(dim, HNSW_NEIGHBOURS, faiss.METRIC_INNER_PRODUCT))
+    if len(vectors):
+        index.add_with_ids(vectors, ids)
+    return index
+
+class CorpusIndex:
+    """
+    Persistent ANN index over the section embeddings of a whole PDF library.
+    The section vectors, ids and metadata are the source of truth (saved as
+    .npy/.json); the FAISS index is derived from them, updated in place on
+    add/remove where the index type allows it and rebuilt otherwise.
+    """
+
+    def __init__(self, directory: Path, dim: int):
+        self.directory = Path(directory)
+        self.dim = dim
+        self.ids = np.empty(0, dtype=np.int64)
+        self.vectors = np.empty((0, dim), dtype=np.float32)
+        self.sections = {}   # id -> section metadata
+        self.documents = {}  # document key -> {"sha256": ..., "ids": [...]}
+        self.next_id = 0
+        self.index = None
+        self.kind = None
+
+    @classmethod
+    def open(cls, directory: Path, dim: int = None):
+        """
+        Load a saved index, or start an empty one (dim is then required).
+        """
+        directory = Path(directory)
+        meta_path = directory / "meta.json"
+        if not meta_path.exists():
+            if dim is None:
+                raise FileNotFoundError(f"No corpus index in {directory}")
+            return cls(directory, dim)
+
+        meta = json.loads(meta_path.read_text())
+        corpus = cls(directory, meta["dim"])
+        corpus.ids = np.load(directory / "ids.npy")
+        corpus.vectors = np.load(directory / "vectors.npy")
+        corpus.sections = {int(k): v for k, v in meta["sections"].items()}
+        corpus.documents = meta["documents"]
+        corpus.next_id = meta["next_id"]
+        if (directory / "index.faiss").exists():
+            corpus.index = faiss.read_index(str(directory / "index.faiss"))
+            corpus.kind = meta["kind"]
+        return corpus
+
+    def __len__(self):
+        return len(self.ids)
+
+    def has_document(self, key: str, sha256: str) -> bool:
+        return self.documents.get(key, {}).get("sha256") == sha256
+
+    def add_document(self, key: str, sha256: str, sections: list, vectors: np.ndarray) -> None:
+        """
+        Add (or replace) one document's sections and their embeddings.
+        """
+        if key in self.documents:
+            self.remove_document(key)
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32).reshape(len(sections), self.dim)
+        ids = np.arange(self.next_id, self.next_id + len(sections), dtype=np.int64)
+        self.next_id += len(sections)
+
+        for section_id, section in zip(ids.tolist(), sections):
+            self.sections[section_id] = {
+                "document": section.get("document", key),
+                "title": section["title"],
+                "page": section["page"],
+                "level": section.get("level"),
+                "text": section["text"],
+            }
+        self.documents[key] = {"sha256": sha256, "ids": ids.tolist()}
+        self.ids = np.concatenate([self.ids, ids])
+        self.vectors = np.concatenate([self.vectors, vectors])
+
+        if self.index is not None and self.kind == index_kind(len(self)) and len(ids):
+            self.index.add_with_ids(vectors, ids)
+        else:
+            self.index = None
+
+    def remove_document(self, key: str) -> None:
+        doc = self.documents.pop(key, None)
+        if doc is None:
+            return
+        ids = np.array(doc["ids"], dtype=np.int64)
+        for section_id in doc["ids"]:
+            self.sections.pop(section_id, None)
+        keep = ~np.isin(self.ids, ids)
+        self.ids = self.ids[keep]
+        self.vectors = self.vectors[keep]
+
+        # Flat and IVF indexes support removal in place; HNSW is rebuilt
+        if self.index is not None and self.kind in ("flat", "ivf") and self.kind == index_kind(len(self)):
+            self.index.remove_ids(ids)
+        else:
+            self.index = None
+
+    def ensure_index(self):
+        if self.index is None:
+            self.kind = index_kind(len(self))
+            self.index = build_faiss_index(self.vectors, self.ids, self.kind)
+        return self.index
+
+    def search(self, query_vec: np.ndarray, k: int = 10, quota: int = None) -> list:
+        """
+        Global top-k sections for a query embedding, best first. With quota,
+        at most quota sections are returned per document; the ANN search is
+        widened until enough documents are covered.
+        """
+        from .rank import top_k
+
+        if not len(self):
+            return []
+        index = self.ensure_index()
+        query = np.ascontiguousarray(query_vec, dtype=np.float32).reshape(1, self.dim)
+        fetch = min(k, len(self))
+        while True:
+            scores, ids = index.search(query, fetch)
+            found = ids[0] >= 0
+            scores, ids = scores[0][found], ids[0][found]
+            hits = [self.sections[int(section_id)] for section_id in ids]
+            groups = [hit["document"] for hit in hits] if quota is not None else None
+            keep = top_k(scores, k, groups, quota)
+            if len(keep) >= k or fetch >= len(self):
+                break
+            fetch = min(4 * fetch, len(self))
+        return [dict(hits[i], score=float(scores[i])) for i in keep]
+
+    def save(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        index = self.ensure_index()
+        meta = {
+            "dim": self.dim,
+            "kind": self.kind,
+            "next_id": self.next_id,
+            "documents": self.documents,
+            "sections": self.sections,
+        }
+        # Write everything to temp names first, then swap into place
+        np.save(self.directory / "ids.tmp.npy", self.ids)
+        np.save(self.directory / "vectors.tmp.npy", self.vectors)
+        faiss.write_index(index, str(self.directory / "index.faiss.tmp"))
+        (self.directory / "meta.json.tmp").write_text(json.dumps(meta))
+        os.replace(self.directory / "ids.tmp.npy", self.directory / "ids.npy")
+        os.replace(self.directory / "vectors.tmp.npy", self.directory / "vectors.npy")
+        os.replace(self.directory / "index.faiss.tmp", self.directory / "index.faiss")
+        os.replace(self.directory / "meta.json.tmp", self.directory / "meta.json")
+
+def sync_library(corpus: CorpusIndex, library_dir: Path, loader_backend: str = loader.DEFAULT_BACKEND) -> dict:
+    """
+    Bring the index in line with the PDFs under library_dir: new or edited
+    files are (re)indexed, deleted files are removed, unchanged files are
+    skipped by content hash.
+    """
+    from . import outline, utils, embed
+
+    library_dir = Path(library_dir)
+    seen = set()
+    counts = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+    for pdf_file in sorted(library_dir.rglob("*.pdf")):
+        key = str(pdf_file.relative_to(library_dir))
+        seen.add(key)
+        sha256 = file_digest(pdf_file)
+        if corpus.has_document(key, sha256):
+            counts["unchanged"] += 1
+            continue
+
+        counts["updated" if key in corpus.documents else "added"] += 1
+        blocks = loader.load(pdf_file, backend=loader_backend)
+        sections = utils.section_slices(blocks, outline.build(blocks))
+        for section in sections:
+            section["document"] = pdf_file.name
+        vectors = embed.encode([s["text"] for s in sections]) if sections else np.empty((0, corpus.dim))
+        corpus.add_document(key, sha256, sections, vectors)
+
+    for key in list(corpus.documents):
+        if key not in seen:
+            corpus.remove_document(key)
+            counts["removed"] += 1
+    return counts
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.corpus",
+                                     description="Global section ranking over a whole PDF library.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    sync = commands.add_parser("sync", help="index new/changed PDFs and drop deleted ones")
+    sync.add_argument("library_dir", type=Path)
+    sync.add_argument("index_dir", type=Path)
+    sync.add_argument("--loader", choices=sorted(loader.BACKENDS), default=loader.DEFAULT_BACKEND)
+
+    query = commands.add_parser("query", help="global top-k sections for a persona and job")
+    query.add_argument("index_dir", type=Path)
+    query.add_argument("persona")
+    query.add_argument("job", nargs="?", default="")
+    query.add_argument("-k", type=int, default=10)
+    query.add_argument("--quota", type=int, default=None, help="max sections per document")
+
+    args = parser.parse_args(argv)
+    from . import embed, rank
+
+    if args.command == "sync":
+        corpus = CorpusIndex.open(args.index_dir, dim=embed.EMBEDDING_DIM)
+        counts = sync_library(corpus, args.library_dir, loader_backend=args.loader)
+        corpus.save()
+        print(json.dumps(dict(counts, sections=len(corpus), index=corpus.kind)))
+    else:
+        corpus = CorpusIndex.open(args.index_dir)
+        query_vec = embed.encode([rank.query_text(f"{args.persona} {args.job}")])[0]
+        hits = corpus.search(query_vec, args.k, quota=args.quota)
+        results = [
+            {
+                "document": hit["document"],
+                "section_title": hit["title"],
+                "importance_rank": rank_no,
+                "page_number": hit["page"],
+                "score": hit["score"],
+            }
+            for rank_no, hit in enumerate(hits, start=1)
+        ]
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,101 @@
-from sentence_transformers import SentenceTransformer
+from pathlib import Path
+import hashlib
 import numpy as np
+import os
+import threading
+from .embed_store import EmbeddingStore, normalize, text_key
+from .lazy import Lazy
+from . import backends, instrument
 
-model = SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
+MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+# Output size of MODEL_NAME; known up front so cache hits never load the model.
+# Any PDI_EMBED_MODEL must produce vectors of this size (load_model checks).
+EMBEDDING_DIM = 384
 
-def encode(texts: list[str]) -> np.ndarray:
+# Backend and model location, see backends.py
+BACKEND = os.environ.get("PDI_EMBED_BACKEND", backends.DEFAULT_BACKEND)
+MODEL_PATH = os.environ.get("PDI_EMBED_MODEL", MODEL_NAME)
+
+def load_model(backend: str = None, path: str = None):
+    backend = backends.check(backend or BACKEND)
+    path = path or MODEL_PATH
+    if backends.is_onnx(backend):
+        if path == MODEL_NAME:
+            raise ValueError(f"The {backend} backend loads an export directory; set PDI_EMBED_MODEL")
+        model = backends.OnnxEncoder(path, backend)
+    else:
+        from sentence_transformers import SentenceTransformer
+
+        model = SentenceTransformer(path)
+        if backend == "int8":
+            model = backends.quantize_int8(model)
+
+    dim = model.get_sentence_embedding_dimension()
+    if dim != EMBEDDING_DIM:
+        raise ValueError(f"{path} produces {dim}-d embeddings; only {EMBEDDING_DIM}-d models "
+                         f"(all-MiniLM-L6-v2 and its exports) are supported")
+    return model
+
+model = Lazy(load_model)
+
+def store_name() -> str:
     """
-    Encode list of texts into embeddings.
+    Embedding store name. Vectors differ between checkpoints and between
+    backends, so anything but MODEL_NAME on torch gets its own store, keyed
+    by backend and a hash of the resolved model path.
     """
-    embeddings = model.encode(
+    if BACKEND == "torch" and MODEL_PATH == MODEL_NAME:
+        return MODEL_NAME
+    source = str(Path(MODEL_PATH).resolve()) if Path(MODEL_PATH).exists() else MODEL_PATH
+    digest = hashlib.sha256(source.encode()).hexdigest()[:12]
+    return f"{Path(source).name}@{BACKEND}-{digest}"
+
+store = Lazy(lambda: EmbeddingStore(
+    Path(os.environ.get("PDI_CACHE_DIR", "/tmp/pdi-cache")) / "embeddings",
+    store_name(),
+    EMBEDDING_DIM,
+))
+
+# The store allows one writer at a time, and an append remaps its vectors;
+# threads sharing the store (server mode) take this lock around store calls
+_store_lock = threading.Lock()
+
+def encode_uncached(texts: list[str]) -> np.ndarray:
+    return model.get().encode(
         texts,
         normalize_embeddings=True,
         batch_size=64,
         show_progress_bar=False
     )
-    return embeddings
\ No newline at end of file
+
+@instrument.instrumented("embed.encode")
+def encode(texts: list[str], use_cache: bool = True) -> np.ndarray:
+    """
+    Encode list of texts into embeddings.
+    Vectors are looked up in the on-disk store by (model, normalized text
+    hash); only texts not seen before are run through the model.
+    """
+    instrument.count("texts_embedded", len(texts))
+    if not use_cache:
+        return encode_uncached(texts)
+
+    vector_store = store.get()
+    keys = [text_key(t) for t in texts]
+    with _store_lock:
+        rows = vector_store.lookup(keys)
+    missing = {}
+    for text, key, row in zip(texts, keys, rows):
+        if row < 0 and key not in missing:
+            missing[key] = normalize(text)
+    instrument.count("embedding_cache_misses", len(missing))
+    instrument.count("embedding_cache_hits", int((rows >= 0).sum()))
+    new_vectors = encode_uncached(list(missing.values())) if missing else None
+
+    embeddings = np.empty((len(texts), vector_store.dim), dtype=np.float32)
+    with _store_lock:
+        if missing:
+            vector_store.add(list(missing), new_vectors)
+            rows = vector_store.lookup(keys, count=False)
+        if len(texts):
+            embeddings[:] = vector_store.vectors(rows)
+    return embeddings
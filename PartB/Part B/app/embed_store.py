@@ -0,0 +1,129 @@
+from contextlib import contextmanager
+from pathlib import Path
+import fcntl
+import hashlib
+import os
+import re
+import numpy as np
+
+KEY_BYTES = 16
+
+def normalize(text: str) -> str:
+    """
+    Collapse whitespace so layout-only differences share one embedding.
+    """
+    return " ".join(text.split())
+
+def text_key(text: str) -> bytes:
+    return hashlib.blake2b(normalize(text).encode("utf-8"), digest_size=KEY_BYTES).digest()
+
+class EmbeddingStore:
+    """
+    Append-only on-disk embedding store for one model.
+    vectors.f32 is a raw float32 matrix (one row per text) read through a
+    memory map, and keys.bin holds the matching 16-byte text hashes in row
+    order, so loading the store never unpickles anything. Vectors are
+    appended before their keys, so a key always points at a complete row.
+    Any number of processes may read and append: appends hold an exclusive
+    flock on the store's lock file, and re-reads a shared one.
+    """
+
+    def __init__(self, directory: Path, model_name: str, dim: int):
+        slug = re.sub(r"[^A-Za-z0-9_.-]+", "--", model_name)
+        self.directory = Path(directory) / slug
+        self.dim = dim
+        self.vectors_path = self.directory / "vectors.f32"
+        self.keys_path = self.directory / "keys.bin"
+        self.lock_path = self.directory / "lock"
+        self.hits = 0
+        self.misses = 0
+        self._index = {}
+        self._vectors = None
+        self._rows = 0
+        self.refresh()
+
+    @contextmanager
+    def _locked(self, operation: int):
+        """
+        Hold a flock (fcntl.LOCK_SH or LOCK_EX) on the store's lock file.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.lock_path, "a") as lock:
+            fcntl.flock(lock, operation)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def refresh(self) -> None:
+        """
+        Re-read the index and remap the vectors, e.g. after another process appended.
+        """
+        if not (self.keys_path.exists() and self.vectors_path.exists()):
+            return
+        with self._locked(fcntl.LOCK_SH):
+            self._refresh()
+
+    def _refresh(self) -> None:
+        # Callers hold the lock. Only complete rows that have a key are mapped,
+        # so a vector file shorter than the key file just maps fewer rows.
+        if not (self.keys_path.exists() and self.vectors_path.exists()):
+            return
+        # Raw bytes, not an S16 array: numpy strips a digest's trailing NULs
+        keys = self.keys_path.read_bytes()
+        row_bytes = self.dim * np.dtype(np.float32).itemsize
+        with open(self.vectors_path, "rb") as f:
+            rows = min(len(keys) // KEY_BYTES, os.fstat(f.fileno()).st_size // row_bytes)
+            if rows == self._rows:
+                return
+            try:
+                vectors = np.memmap(f, dtype=np.float32, mode="r", shape=(rows, self.dim)) if rows else None
+            except ValueError:
+                # Shrunk under us (a writer ignoring the lock): keep the previous view
+                return
+        self._index = {keys[row * KEY_BYTES:(row + 1) * KEY_BYTES]: row for row in range(rows)}
+        self._vectors = vectors
+        self._rows = rows
+
+    def __len__(self):
+        return self._rows
+
+    def lookup(self, keys: list, count: bool = True) -> np.ndarray:
+        """
+        Row number of each key, -1 where the key is not stored.
+        """
+        rows = np.array([self._index.get(key, -1) for key in keys], dtype=np.int64)
+        if count:
+            found = int((rows >= 0).sum())
+            self.hits += found
+            self.misses += len(rows) - found
+        return rows
+
+    def vectors(self, rows: np.ndarray) -> np.ndarray:
+        return np.asarray(self._vectors[rows])
+
+    def add(self, keys: list, vectors: np.ndarray) -> None:
+        """
+        Append vectors for keys not stored yet (by this or another process).
+        """
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32).reshape(len(keys), self.dim)
+        with self._locked(fcntl.LOCK_EX):
+            self._refresh()
+            new = {}
+            for i, key in enumerate(keys):
+                if key not in self._index:
+                    new.setdefault(key, i)
+            if not new:
+                return
+            # Drop any partial tail left by an interrupted append before writing
+            for path, row_bytes in ((self.vectors_path, self.dim * 4), (self.keys_path, KEY_BYTES)):
+                if path.exists():
+                    os.truncate(path, self._rows * row_bytes)
+            with open(self.vectors_path, "ab") as f:
+                f.write(vectors[list(new.values())].tobytes())
+            with open(self.keys_path, "ab") as f:
+                f.write(b"".join(new))
+            self._refresh()
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "rows": self._rows}
@@ -0,0 +1,141 @@
+from collections import Counter
+from contextlib import contextmanager
+import contextvars
+import functools
+import json
+import resource
+import sys
+import threading
+import time
+
+# The profiler collecting measurements, or None when profiling is off. A
+# context variable, so concurrent runs (server jobs) each see their own.
+_active = contextvars.ContextVar("pdi_profiler", default=None)
+
+class Profiler:
+    """
+    Per-stage wall/CPU time and call counts plus named counters (blocks,
+    sections, tokens, cache hits/misses) for one run. Stage times are
+    inclusive, and CPU time is the whole process's (torch runs on its own
+    threads), so concurrent stages share it.
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self.counters = Counter()
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+        self._cpu_start = time.process_time()
+
+    @contextmanager
+    def stage(self, name: str):
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            with self._lock:
+                stats = self.stages.setdefault(name, {"calls": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0})
+                stats["calls"] += 1
+                stats["wall_seconds"] += wall
+                stats["cpu_seconds"] += cpu
+
+    def count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.counters[name] += n
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "wall_seconds": time.perf_counter() - self._start,
+                "cpu_seconds": time.process_time() - self._cpu_start,
+                "peak_rss_bytes": peak_rss_bytes(),
+                "stages": {name: dict(stats) for name, stats in self.stages.items()},
+                "counters": dict(self.counters),
+            }
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self, labels: dict = None, prefix: str = "pdi") -> str:
+        """
+        The snapshot in Prometheus text exposition format.
+        """
+        snapshot = self.snapshot()
+        base = dict(labels or {})
+
+        def sample(name, value, **extra):
+            merged = {**base, **extra}
+            label_text = ",".join(f'{k}="{escape(str(v))}"' for k, v in merged.items())
+            return f"{prefix}_{name}{{{label_text}}} {value}" if label_text else f"{prefix}_{name} {value}"
+
+        lines = []
+        for name, help_text, value in [
+            ("run_wall_seconds", "Wall time of the whole run.", snapshot["wall_seconds"]),
+            ("run_cpu_seconds", "Process CPU time of the whole run.", snapshot["cpu_seconds"]),
+            ("peak_rss_bytes", "Peak resident set size of the process.", snapshot["peak_rss_bytes"]),
+        ]:
+            lines += [f"# HELP {prefix}_{name} {help_text}", f"# TYPE {prefix}_{name} gauge", sample(name, value)]
+
+        for field, help_text in [
+            ("calls", "Calls per pipeline stage."),
+            ("wall_seconds", "Wall time per pipeline stage."),
+            ("cpu_seconds", "Process CPU time per pipeline stage."),
+        ]:
+            name = f"stage_{field}"
+            lines += [f"# HELP {prefix}_{name} {help_text}", f"# TYPE {prefix}_{name} gauge"]
+            lines += [sample(name, stats[field], stage=stage) for stage, stats in sorted(snapshot["stages"].items())]
+
+        for counter, value in sorted(snapshot["counters"].items()):
+            name = f"{counter}_total"
+            lines += [f"# TYPE {prefix}_{name} counter", sample(name, value)]
+        return "\n".join(lines) + "\n"
+
+def escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def peak_rss_bytes() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+def active():
+    """
+    The profiler active in the current context, or None.
+    """
+    return _active.get()
+
+@contextmanager
+def activate(profiler):
+    """
+    Make profiler the active one for the with-block in the current context
+    (None leaves profiling off). Threads started inside the block see it
+    only if they run in a copy of this context (contextvars.copy_context).
+    """
+    token = _active.set(profiler)
+    try:
+        yield profiler
+    finally:
+        _active.reset(token)
+
+def count(name: str, n: int = 1) -> None:
+    profiler = _active.get()
+    if profiler is not None:
+        profiler.count(name, n)
+
+def instrumented(stage: str):
+    """
+    Time calls of the decorated function as stage while a profiler is
+    active; when none is, the only overhead is one context variable lookup
+    per call.
+    """
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            profiler = _active.get()
+            if profiler is None:
+                return fn(*args, **kwargs)
+            with profiler.stage(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
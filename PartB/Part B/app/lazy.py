@@ -0,0 +1,25 @@
+import threading
+
+class Lazy:
+    """
+    A value built by factory() on first get(), exactly once even when
+    several threads ask for it at the same time.
+    """
+
+    def __init__(self, factory):
+        self.factory = factory
+        self._lock = threading.Lock()
+        self._value = None
+        self._built = False
+
+    @property
+    def built(self) -> bool:
+        return self._built
+
+    def get(self):
+        if not self._built:
+            with self._lock:
+                if not self._built:
+                    self._value = self.factory()
+                    self._built = True
+        return self._value
@@ -1,17 +1,46 @@
-from pdfminer.high_level import extract_pages
-from pdfminer.layout import LTTextContainer, LTChar
-import joblib, hashlib
+import hashlib, json, os
 from pathlib import Path
+from .cache import DiskCache, file_digest
+from . import instrument
 
-def load(pdf_path: Path):
+# Bump whenever the block schema or parsing logic changes, so old entries miss
+LOADER_VERSION = 2
+
+DEFAULT_BACKEND = "pdfminer"
+
+cache = DiskCache(
+    Path(os.environ.get("PDI_CACHE_DIR", "/tmp/pdi-cache")) / "blocks",
+    max_bytes=int(os.environ.get("PDI_CACHE_MAX_MB", "512")) * 1024 * 1024,
+)
+
+def configure_cache(directory: Path = None, max_bytes: int = None):
+    """
+    Point the parse cache at another directory and/or size limit.
+    """
+    global cache
+    cache = DiskCache(
+        Path(directory) if directory is not None else cache.directory,
+        max_bytes=max_bytes if max_bytes is not None else cache.max_bytes,
+    )
+    return cache
+
+def cache_key(pdf_path: Path, options: dict) -> str:
+    """
+    Key parsed blocks by file content, loader version and parse options,
+    so edited files miss and identical copies in other collections hit.
+    """
+    payload = json.dumps(
+        {"sha256": file_digest(pdf_path), "version": LOADER_VERSION, "options": options},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def parse_pdfminer(pdf_path: Path):
     """
     Parse PDF into a list of text blocks with font size and coordinates.
-    Caches parsed result in /tmp/<hash>.pkl.
     """
-    hash_id = hashlib.md5(str(pdf_path).encode()).hexdigest()
-    cache_path = Path(f"/tmp/{hash_id}.pkl")
-    if cache_path.exists():
-        return joblib.load(cache_path)
+    from pdfminer.high_level import extract_pages
+    from pdfminer.layout import LTTextContainer, LTChar
 
     blocks = []
     for page_num, page_layout in enumerate(extract_pages(pdf_path)):
@@ -31,5 +60,66 @@ def load(pdf_path: Path):
                     "y0": y0,
                     "page": page_num + 1
                 })
-    joblib.dump(blocks, cache_path)
-    return blocks
\ No newline at end of file
+    return blocks
+
+def parse_pymupdf(pdf_path: Path):
+    """
+    PyMuPDF equivalent of parse_pdfminer, producing the same block schema.
+    Coordinates are converted to pdfminer's bottom-left origin, and font
+    size is the character-weighted average over the block's spans.
+    """
+    import fitz  # PyMuPDF
+
+    blocks = []
+    with fitz.open(pdf_path) as doc:
+        for page_num, page in enumerate(doc):
+            page_height = page.rect.height
+            for block in page.get_text("dict")["blocks"]:
+                if block.get("type") != 0:
+                    continue
+                lines = []
+                size_total = 0.0
+                char_count = 0
+                for line in block["lines"]:
+                    lines.append("".join(span["text"] for span in line["spans"]))
+                    for span in line["spans"]:
+                        size_total += span["size"] * len(span["text"])
+                        char_count += len(span["text"])
+                text = "\n".join(lines).strip()
+                if not text:
+                    continue
+                x0, _, _, y1 = block["bbox"]
+                blocks.append({
+                    "text": text,
+                    "font_size": size_total / char_count if char_count else 0,
+                    "x0": x0,
+                    "y0": page_height - y1,
+                    "page": page_num + 1
+                })
+    return blocks
+
+# Loader backends: name -> parse function returning the block list
+BACKENDS = {
+    "pdfminer": parse_pdfminer,
+    "pymupdf": parse_pymupdf,
+}
+
+@instrument.instrumented("loader.load")
+def load(pdf_path: Path, backend: str = DEFAULT_BACKEND, use_cache: bool = True):
+    """
+    Parse PDF into a list of text blocks with font size and coordinates,
+    using one of BACKENDS. Results are cached on disk by content hash
+    (see cache_key).
+    """
+    parse = BACKENDS[backend]
+    if not use_cache:
+        blocks = parse(pdf_path)
+    else:
+        key = cache_key(pdf_path, {"parser": backend})
+        blocks = cache.get(key)
+        instrument.count("parse_cache_hits" if blocks is not None else "parse_cache_misses")
+        if blocks is None:
+            blocks = parse(pdf_path)
+            cache.put(key, blocks)
+    instrument.count("blocks", len(blocks))
+    return blocks
@@ -1,37 +1,146 @@
 from pathlib import Path
-import sys
-from . import loader, outline, utils, embed, rank, summarise, schema
+import argparse
+import json
+from . import loader, outline, utils, embed, rank, summarise, bm25, instrument
 
-def process(collection_path: Path, output_dir: Path):
-    persona_file = collection_path / "challenge1b_input.json"
-    persona, job = utils.load_persona(persona_file)
-    persona_text = f"{persona} {job}"
+# Pipelined mode (app.pipeline): parse processes (0 parses inline) and parsed
+# PDFs allowed to wait for the embedding stage
+DEFAULT_PARSE_WORKERS = 0
+DEFAULT_QUEUE_SIZE = 4
 
-    pdf_dir = collection_path / "PDFs"
-    output_dir.mkdir(parents=True, exist_ok=True)
+def extract_sections(pdf_file: Path, loader_backend: str = loader.DEFAULT_BACKEND):
+    """
+    Parse one PDF and slice it into sections at its headings.
+    """
+    blocks = loader.load(pdf_file, backend=loader_backend)
+    outline_data = outline.build(blocks)
+    return utils.section_slices(blocks, outline_data)
+
+def rank_documents(documents, vectors, query_vec, persona_text, top_k: int = rank.DEFAULT_TOP_K):
+    """
+    Select the top sections of each (pdf_file, sections) document.
+    vectors holds the section embeddings of all documents, in order.
+    """
+    texts = [s["text"] for _, sections in documents for s in sections]
+    # One BM25 index over every section of the collection, persisted by content
+    lexical = bm25.load_or_build(texts).score(rank.query_text(persona_text))
 
     all_sections = []
-    
-    for pdf_file in pdf_dir.glob("*.pdf"):
-        blocks = loader.load(pdf_file)
-        outline_data = outline.build(blocks)
-        sections = utils.section_slices(blocks, outline_data)
-        embeddings = embed.encode([s["text"] for s in sections])
-        ranked_sections = rank.select(sections, embeddings, persona_text)
-        refined_sections = [summarise.refine(s) for s in ranked_sections]
-        
+    offset = 0
+    for pdf_file, sections in documents:
+        embeddings = vectors[offset:offset + len(sections)]
+        lexical_scores = lexical[offset:offset + len(sections)]
+        offset += len(sections)
+        ranked_sections = rank.select(sections, embeddings, persona_text, query_vec=query_vec,
+                                      lexical_scores=lexical_scores, k=top_k)
+
         # Add document info to sections
-        for section in refined_sections:
+        for section in ranked_sections:
             section["document"] = pdf_file.name
-        
-        all_sections.extend(refined_sections)
-    
-    # Generate single consolidated output
-    json_str = schema.output(collection_path, persona_file, all_sections)
+
+        all_sections.extend(ranked_sections)
+    return all_sections
+
+def process(collection_path: Path, output_dir: Path, loader_backend: str = loader.DEFAULT_BACKEND,
+            summary_batch_size: int = summarise.DEFAULT_BATCH_SIZE, top_k: int = rank.DEFAULT_TOP_K, timings: dict = None, profile: bool = False):
+    """
+    Rank and summarise one collection into output_dir/challenge1b_output.json.
+    Returns the wall time of each stage in seconds (added into timings if given).
+    With profile, per-function timings, counts, cache hits and peak RSS are
+    written next to the output as profile.json and profile.prom.
+    """
+    timings = {} if timings is None else timings
+    profiler = instrument.Profiler() if profile else None
+    with instrument.activate(profiler):
+        persona_file = collection_path / "challenge1b_input.json"
+        persona, job = utils.load_persona(persona_file)
+        persona_text = f"{persona} {job}"
+
+        pdf_dir = collection_path / "PDFs"
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        # Extract the sections of every document first
+        documents = []
+        with utils.timed(timings, "extract"):
+            for pdf_file in pdf_dir.glob("*.pdf"):
+                sections = extract_sections(pdf_file, loader_backend)
+                if sections:
+                    documents.append((pdf_file, sections))
+
+        # Encode all section texts and the persona query in one batched call
+        texts = [s["text"] for _, sections in documents for s in sections]
+        with utils.timed(timings, "embed"):
+            vectors = embed.encode(texts + [rank.query_text(persona_text)])
+        query_vec = vectors[-1]
+
+        with utils.timed(timings, "rank"):
+            all_sections = rank_documents(documents, vectors[:-1], query_vec, persona_text, top_k)
+
+        # Summarise the selected sections of every document in shared batches
+        with utils.timed(timings, "summarise"):
+            summarise.refine_batch(all_sections, batch_size=summary_batch_size)
+
+        # Generate single consolidated output
+        with utils.timed(timings, "output"):
+            write_output(collection_path, output_dir, all_sections)
+
+    if profiler is not None:
+        write_profile(profiler, output_dir, collection_path, timings)
+    return timings
+
+def write_output(collection_path: Path, output_dir: Path, all_sections):
+    from . import schema
+
+    json_str = schema.output(collection_path, collection_path / "challenge1b_input.json", all_sections)
     (output_dir / "challenge1b_output.json").write_text(json_str)
 
+def add_pipeline_options(parser):
+    parser.add_argument("--loader", choices=sorted(loader.BACKENDS), default=loader.DEFAULT_BACKEND,
+                        help="PDF parsing backend (default: %(default)s)")
+    parser.add_argument("--summary-batch-size", type=int, default=summarise.DEFAULT_BATCH_SIZE,
+                        help="sections per T5 generate call (default: %(default)s)")
+    parser.add_argument("--threads", type=int, default=None,
+                        help="torch intra-op threads (default: torch's own choice)")
+    parser.add_argument("--top-k", type=int, default=rank.DEFAULT_TOP_K,
+                        help="sections selected per document (default: %(default)s)")
+    return parser
+
+def write_profile(profiler, output_dir: Path, collection_path: Path, timings: dict):
+    profile = dict(profiler.snapshot(), collection=str(collection_path), pipeline_stages=timings)
+    (output_dir / "profile.json").write_text(json.dumps(profile, indent=2))
+    (output_dir / "profile.prom").write_text(profiler.to_prometheus({"collection": collection_path.name}))
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.main")
+    parser.add_argument("collection_path", type=Path)
+    parser.add_argument("output_dir", type=Path)
+    add_pipeline_options(parser)
+    parser.add_argument("--parse-workers", type=int, default=DEFAULT_PARSE_WORKERS,
+                        help="parse PDFs in this many processes while embedding overlaps (default: sequential)")
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE,
+                        help="parsed PDFs allowed to wait for the embedding stage (default: %(default)s)")
+    parser.add_argument("--summary-workers", type=int, default=1,
+                        help="threads running T5 summarisation (default: %(default)s)")
+    parser.add_argument("--profile", action="store_true",
+                        help="write profile.json and profile.prom (Prometheus text) next to the output")
+    return parser.parse_args(argv)
+
+def run(args):
+    """
+    Process one collection as parsed by parse_args: pipelined when parse
+    workers or several summary workers are asked for, else sequentially.
+    """
+    summarise.set_threads(args.threads)
+    if args.parse_workers > 0 or args.summary_workers > 1:
+        from . import pipeline
+
+        return pipeline.process(args.collection_path, args.output_dir, loader_backend=args.loader,
+                                summary_batch_size=args.summary_batch_size, top_k=args.top_k,
+                                parse_workers=args.parse_workers, queue_size=args.queue_size,
+                                summary_workers=args.summary_workers, profile=args.profile)
+    return process(args.collection_path, args.output_dir, loader_backend=args.loader,
+                   summary_batch_size=args.summary_batch_size, top_k=args.top_k,
+                   profile=args.profile)
+
 if __name__ == "__main__":
-    if len(sys.argv) != 3:
-        print("Usage: python -m app.main <collection_path> <output_dir>")
-        sys.exit(1)
-    process(Path(sys.argv[1]), Path(sys.argv[2]))
\ No newline at end of file
+    run(parse_args())
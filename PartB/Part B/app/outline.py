@@ -1,44 +1,168 @@
-from sklearn.cluster import KMeans
 import numpy as np
 import re
+from . import instrument
 
-def build(blocks):
+N_LEVELS = 3
+DEFAULT_CLUSTERING = "exact"
+
+# A heading is a short block set noticeably larger than the body text
+HEADING_MIN_DELTA = 0.5
+HEADING_MAX_CHARS = 150
+HEADING_MAX_WORDS = 20
+# Documents that mark headings by weight alone (one font size throughout)
+# fall back to standalone short lines
+SHAPE_MAX_WORDS = 10
+
+def clean_title(text):
     """
-    Cluster font sizes to classify headings into H1, H2, H3.
-    Extract cleaner section titles.
+    Clean up the title - take first sentence or first 100 chars.
     """
-    if not blocks:
-        return []
+    # Remove extra whitespace and newlines
+    title = re.sub(r'\s+', ' ', text.strip())
+    # Take first sentence or first 100 characters
+    if len(title) > 100:
+        # Try to find a sentence break
+        sentence_end = title.find('.')
+        if sentence_end > 0 and sentence_end < 100:
+            title = title[:sentence_end + 1]
+        else:
+            title = title[:100].rstrip() + "..."
+    return title
+
+def body_font_size(font_sizes, lengths):
+    """
+    Font size covering the most characters, rounded to half a point.
+    """
+    halves = np.round(np.asarray(font_sizes) * 2).astype(np.int64)
+    return np.bincount(halves, weights=lengths).argmax() / 2
+
+def is_heading_text(text):
+    text = text.strip()
+    return (
+        len(text) <= HEADING_MAX_CHARS
+        and len(text.split()) <= HEADING_MAX_WORDS
+        and any(c.isalpha() for c in text)
+    )
+
+def looks_like_heading(text):
+    text = text.strip()
+    return (
+        "\n" not in text
+        and len(text.split()) <= SHAPE_MAX_WORDS
+        and text[:1].isalnum()
+        and not text[:1].islower()
+        and text[-1:] not in ".,;:"
+    )
+
+def cluster_font_sizes_exact(font_sizes, k=N_LEVELS):
+    """
+    Optimal 1-D k-means (minimum within-cluster sum of squares) by dynamic
+    programming over the distinct font sizes, weighted by how often each
+    occurs. Deterministic, and fast because font sizes are heavily
+    quantised. Returns a cluster label per size; labels increase with size.
+    """
+    values, inverse, counts = np.unique(font_sizes, return_inverse=True, return_counts=True)
+    m = len(values)
+    k = min(k, m)
+    if k <= 1:
+        return np.zeros(len(font_sizes), dtype=np.int64)
+
+    w = np.concatenate([[0], np.cumsum(counts)]).astype(np.float64)
+    s1 = np.concatenate([[0], np.cumsum(counts * values)])
+    s2 = np.concatenate([[0], np.cumsum(counts * values ** 2)])
+
+    def cost(i, j):
+        # Sum of squared deviations of distinct values i..j-1 (vectorised over i)
+        total = w[j] - w[i]
+        mean_sq = (s1[j] - s1[i]) ** 2 / total
+        return (s2[j] - s2[i]) - mean_sq
+
+    # best[c, j]: cost of splitting the first j values into c + 1 clusters
+    best = np.full((k, m + 1), np.inf)
+    split = np.zeros((k, m + 1), dtype=np.int64)
+    best[0, 1:] = cost(np.zeros(m, dtype=np.int64), np.arange(1, m + 1))
+    for c in range(1, k):
+        for j in range(c + 1, m + 1):
+            starts = np.arange(c, j)
+            candidates = best[c - 1, starts] + cost(starts, j)
+            split[c, j] = starts[np.argmin(candidates)]
+            best[c, j] = candidates.min()
 
-    font_sizes = np.array([b['font_size'] for b in blocks]).reshape(-1, 1)
-    kmeans = KMeans(n_clusters=min(3, len(blocks)), random_state=0).fit(font_sizes)
-    labels = kmeans.labels_
+    # Walk the splits back to label each distinct value
+    value_labels = np.empty(m, dtype=np.int64)
+    j = m
+    for c in range(k - 1, -1, -1):
+        i = split[c, j] if c else 0
+        value_labels[i:j] = c
+        j = i
+    return value_labels[inverse]
+
+def cluster_font_sizes_kmeans(font_sizes, k=N_LEVELS):
+    """
+    sklearn KMeans on the raw font sizes (the original clustering).
+    """
+    from sklearn.cluster import KMeans
+
+    font_sizes = np.asarray(font_sizes).reshape(-1, 1)
+    return KMeans(n_clusters=min(k, len(font_sizes)), random_state=0).fit(font_sizes).labels_
+
+CLUSTERING = {
+    "exact": cluster_font_sizes_exact,
+    "kmeans": cluster_font_sizes_kmeans,
+}
+
+def heading_levels(font_sizes, clustering=DEFAULT_CLUSTERING):
+    """
+    H1/H2/H3 per block: font clusters ordered by mean size, largest first.
+    """
+    font_sizes = np.asarray(font_sizes, dtype=np.float64)
+    labels = CLUSTERING[clustering](font_sizes)
     centroids = sorted(
-        [(i, np.mean(font_sizes[labels == i])) for i in range(len(set(labels)))],
+        [(label, font_sizes[labels == label].mean()) for label in np.unique(labels)],
         key=lambda x: -x[1]
     )
     label_map = {label: f"H{i+1}" for i, (label, _) in enumerate(centroids)}
+    return [label_map[label] for label in labels]
+
+@instrument.instrumented("outline.build")
+def build(blocks, clustering=DEFAULT_CLUSTERING):
+    """
+    Cluster font sizes to classify headings into H1, H2, H3 (clustering is
+    a key of CLUSTERING).
+    Only blocks larger than the body text (and short enough to be a title)
+    start a section, so each section spans its heading's body text up to
+    the next heading. Text before the first heading, or a document with no
+    headings at all, becomes one section titled by its first block.
+    Documents whose headings are not larger than the body text fall back to
+    short standalone lines (see looks_like_heading).
+    """
+    if not blocks:
+        return []
+
+    font_sizes = np.array([b['font_size'] for b in blocks])
+    levels = heading_levels(font_sizes, clustering)
+
+    lengths = np.array([len(b["text"]) for b in blocks], dtype=np.float64)
+    body_size = body_font_size(font_sizes, lengths)
+
+    heading_idx = [
+        idx for idx, block in enumerate(blocks)
+        if block["font_size"] >= body_size + HEADING_MIN_DELTA and is_heading_text(block["text"])
+    ]
+    if not heading_idx:
+        heading_idx = [idx for idx, block in enumerate(blocks) if looks_like_heading(block["text"])]
+    if not heading_idx or heading_idx[0] != 0:
+        heading_idx.insert(0, 0)
 
     sections = []
-    for idx, block in enumerate(blocks):
-        # Clean up the title - take first sentence or first 100 chars
-        title = block["text"]
-        # Remove extra whitespace and newlines
-        title = re.sub(r'\s+', ' ', title.strip())
-        # Take first sentence or first 100 characters
-        if len(title) > 100:
-            # Try to find a sentence break
-            sentence_end = title.find('.')
-            if sentence_end > 0 and sentence_end < 100:
-                title = title[:sentence_end + 1]
-            else:
-                title = title[:100].rstrip() + "..."
-        
+    for i, idx in enumerate(heading_idx):
+        block = blocks[idx]
+        end = heading_idx[i + 1] - 1 if i + 1 < len(heading_idx) else len(blocks) - 1
         sections.append({
             "page": block["page"],
-            "level": label_map[labels[idx]],
-            "title": title,
+            "level": levels[idx],
+            "title": clean_title(block["text"]),
             "start_idx": idx,
-            "end_idx": idx
+            "end_idx": end
         })
-    return sections
\ No newline at end of file
+    return sections
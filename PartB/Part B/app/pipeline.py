@@ -0,0 +1,130 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from collections import deque
+import contextvars
+import multiprocessing
+from pathlib import Path
+import numpy as np
+from . import loader, utils, embed, rank, summarise, instrument
+from .main import (DEFAULT_PARSE_WORKERS, DEFAULT_QUEUE_SIZE, extract_sections, rank_documents, write_output,
+                   write_profile)
+
+DEFAULT_EMBED_BATCH_SIZE = 64
+
+def parsed_documents(pdf_files, loader_backend: str = loader.DEFAULT_BACKEND,
+                     workers: int = DEFAULT_PARSE_WORKERS, queue_size: int = DEFAULT_QUEUE_SIZE):
+    """
+    Yield (pdf_file, sections) in input order while a process pool parses
+    ahead. At most workers + queue_size PDFs are in flight or waiting to be
+    consumed, so a slow consumer holds the parsers back (backpressure).
+    workers=0 parses inline.
+    """
+    if workers <= 0:
+        for pdf_file in pdf_files:
+            yield pdf_file, extract_sections(pdf_file, loader_backend)
+        return
+
+    files = iter(pdf_files)
+    # Spawned, not forked: the parent may already run torch or server threads
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        pending = deque()
+
+        def submit_next():
+            pdf_file = next(files, None)
+            if pdf_file is not None:
+                pending.append((pdf_file, pool.submit(extract_sections, pdf_file, loader_backend)))
+
+        for _ in range(workers + queue_size):
+            submit_next()
+        while pending:
+            pdf_file, future = pending.popleft()
+            sections = future.result()
+            submit_next()
+            yield pdf_file, sections
+
+def embedded_documents(documents, batch_size: int = DEFAULT_EMBED_BATCH_SIZE, timings: dict = None):
+    """
+    Encode section texts in micro-batches as documents arrive, so the model
+    runs while the parsers work on later PDFs. Returns (documents, vectors)
+    with vectors aligned to the documents' sections in order.
+    Adds to timings["extract"] the time spent waiting for parsed documents
+    and to timings["embed"] the time spent encoding; together they are the
+    wall time of the overlapped stages.
+    """
+    timings = {} if timings is None else timings
+    documents = iter(documents)
+    kept, chunks, pending = [], [], []
+    while True:
+        with utils.timed(timings, "extract"):
+            pdf_file, sections = next(documents, (None, None))
+        if pdf_file is None:
+            break
+        if not sections:
+            continue
+        kept.append((pdf_file, sections))
+        pending.extend(s["text"] for s in sections)
+        if len(pending) >= batch_size:
+            with utils.timed(timings, "embed"):
+                chunks.append(embed.encode(pending))
+            pending = []
+    if pending:
+        with utils.timed(timings, "embed"):
+            chunks.append(embed.encode(pending))
+    vectors = np.concatenate(chunks) if chunks else np.empty((0, embed.EMBEDDING_DIM), dtype=np.float32)
+    return kept, vectors
+
+def summarise_parallel(sections, workers: int = 1, batch_size: int = summarise.DEFAULT_BATCH_SIZE):
+    """
+    refine_batch split across worker threads (torch releases the GIL in generate).
+    Each chunk runs in a copy of the caller's context, so the active profiler
+    sees it.
+    """
+    if workers <= 1 or len(sections) <= 1:
+        return summarise.refine_batch(sections, batch_size=batch_size)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        chunks = [sections[i::workers] for i in range(workers)]
+        futures = [pool.submit(contextvars.copy_context().run, summarise.refine_batch, chunk, batch_size=batch_size)
+                   for chunk in chunks]
+        for future in futures:
+            future.result()
+    return sections
+
+def process(collection_path: Path, output_dir: Path, loader_backend: str = loader.DEFAULT_BACKEND,
+            summary_batch_size: int = summarise.DEFAULT_BATCH_SIZE, top_k: int = rank.DEFAULT_TOP_K, timings: dict = None,
+            parse_workers: int = DEFAULT_PARSE_WORKERS, queue_size: int = DEFAULT_QUEUE_SIZE,
+            embed_batch_size: int = DEFAULT_EMBED_BATCH_SIZE, summary_workers: int = 1, profile: bool = False):
+    """
+    Pipelined main.process with the same output: parsing runs in a process
+    pool while the embedding stage encodes finished documents. Ranking needs
+    collection-wide BM25 statistics, so it waits for every section; the
+    selected sections are then summarised by summary_workers threads.
+    profile writes profile.json and profile.prom as main.process does;
+    PDFs parsed in worker processes are not in its per-function stats.
+    """
+    timings = {} if timings is None else timings
+    profiler = instrument.Profiler() if profile else None
+    with instrument.activate(profiler):
+        persona_file = collection_path / "challenge1b_input.json"
+        persona, job = utils.load_persona(persona_file)
+        persona_text = f"{persona} {job}"
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        pdf_files = list((collection_path / "PDFs").glob("*.pdf"))
+        documents = parsed_documents(pdf_files, loader_backend, parse_workers, queue_size)
+        # Stage keys as in main.process; extract is the embedding stage's wait for parsers
+        documents, vectors = embedded_documents(documents, embed_batch_size, timings)
+        with utils.timed(timings, "embed"):
+            query_vec = embed.encode([rank.query_text(persona_text)])[0]
+
+        with utils.timed(timings, "rank"):
+            all_sections = rank_documents(documents, vectors, query_vec, persona_text, top_k)
+
+        with utils.timed(timings, "summarise"):
+            summarise_parallel(all_sections, summary_workers, summary_batch_size)
+
+        with utils.timed(timings, "output"):
+            write_output(collection_path, output_dir, all_sections)
+
+    if profiler is not None:
+        write_profile(profiler, output_dir, collection_path, timings)
+    return timings
@@ -1,42 +1,152 @@
-from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.feature_extraction.text import TfidfVectorizer
+from collections import Counter
+import heapq
 import numpy as np
+from .bm25 import BM25Index
+from . import instrument
 
-def hybrid_score(query_vec, section_vecs, texts):
+DEFAULT_TOP_K = 5
+
+def cosine_scores(query_vec, section_vecs):
+    """
+    Cosine similarity of the query against each row (0 for zero vectors).
+    """
+    query_vec = np.asarray(query_vec, dtype=np.float64)
+    section_vecs = np.asarray(section_vecs, dtype=np.float64)
+    norms = np.linalg.norm(section_vecs, axis=1) * np.linalg.norm(query_vec)
+    dots = section_vecs @ query_vec
+    return np.divide(dots, norms, out=np.zeros_like(dots), where=norms > 0)
+
+def hybrid_score(query_vec, section_vecs, lexical_scores):
     """
-    Compute hybrid score = 0.6*cosine + 0.4*BM25-like TFIDF sum.
+    Compute hybrid score = 0.6*cosine + 0.4*BM25.
+    BM25 scores are scaled by their maximum so both terms are in [0, 1].
     """
-    cos_scores = cosine_similarity([query_vec], section_vecs).flatten()
-    vectorizer = TfidfVectorizer()
-    tfidf_matrix = vectorizer.fit_transform(texts)
-    bm25_scores = np.array(tfidf_matrix.sum(axis=1)).ravel()
+    cos_scores = cosine_scores(query_vec, section_vecs)
+    lexical_scores = np.asarray(lexical_scores, dtype=np.float64)
+    top = lexical_scores.max() if len(lexical_scores) else 0.0
+    bm25_scores = lexical_scores / top if top > 0 else lexical_scores
 
     return 0.6 * cos_scores + 0.4 * bm25_scores
 
-def select(sections, embeddings, persona_query):
+def query_text(persona_query):
     """
-    Select top-ranked sections based on persona query embedding.
-    Improved to better match persona requirements.
+    Create a more specific query based on persona.
     """
-    # Create a more specific query based on persona
     if "travel" in persona_query.lower():
-        query_keywords = "travel planning trip itinerary destination attractions activities"
+        return "travel planning trip itinerary destination attractions activities"
     elif "food" in persona_query.lower() or "recipe" in persona_query.lower():
-        query_keywords = "cooking recipes food preparation ingredients cuisine"
+        return "cooking recipes food preparation ingredients cuisine"
     elif "adobe" in persona_query.lower() or "acrobat" in persona_query.lower():
-        query_keywords = "adobe acrobat forms documents software tutorial"
+        return "adobe acrobat forms documents software tutorial"
+    return persona_query
+
+def top_k(scores, k: int = DEFAULT_TOP_K, groups=None, quota: int = None) -> np.ndarray:
+    """
+    Indices of the k highest scores, best first, in O(n) via argpartition.
+    Ties keep input order, as a stable descending sort would. With groups
+    and quota, at most quota items are taken from each group.
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    n = len(scores)
+    if quota is not None and groups is not None:
+        return _top_k_quota(scores, k, np.unique(np.asarray(groups), return_inverse=True)[1], quota)
+
+    k = min(k, n)
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k < n:
+        threshold = np.partition(scores, n - k)[n - k]
+        above = np.flatnonzero(scores > threshold)
+        ties = np.flatnonzero(scores == threshold)[:k - len(above)]
+        candidates = np.concatenate([above, ties])
     else:
-        query_keywords = persona_query
-    
-    # Encode the enhanced query
-    from .embed import encode
-    query_vec = encode([query_keywords])[0]
-    
-    scores = hybrid_score(query_vec, embeddings, [s["text"] for s in sections])
-    ranked = sorted(zip(sections, scores), key=lambda x: x[1], reverse=True)
-    
+        candidates = np.arange(n)
+    return candidates[np.lexsort((candidates, -scores[candidates]))]
+
+def _top_k_quota(scores, k, group_ids, quota):
+    # Greedy over a growing prefix of the ranking: once the prefix yields k
+    # items within quota, the rest of the ranking cannot change the answer.
+    n = len(scores)
+    prefix = min(k, n)
+    while True:
+        candidates = top_k(scores, prefix)
+        groups = group_ids[candidates]
+        order = np.argsort(groups, kind="stable")
+        sorted_groups = groups[order]
+        starts = np.r_[True, sorted_groups[1:] != sorted_groups[:-1]]
+        positions = np.arange(len(order))
+        within = np.empty(len(order), dtype=np.int64)
+        within[order] = positions - np.maximum.accumulate(np.where(starts, positions, 0))
+        selected = candidates[within < quota]
+        if len(selected) >= k or prefix >= n:
+            return selected[:k]
+        prefix = min(2 * prefix, n)
+
+class TopK:
+    """
+    Running top-k over score batches that do not fit in memory together.
+    Each batch is cut to its own top k with top_k(), then heap-merged with
+    the current best list; the result equals top_k() over all batches.
+    """
+
+    def __init__(self, k: int = DEFAULT_TOP_K, quota: int = None):
+        self.k = k
+        self.quota = quota
+        self.best = []  # (-score, arrival, group, item), best first
+        self.seen = 0
+
+    def push(self, scores, items, groups=None):
+        scores = np.asarray(scores, dtype=np.float64)
+        keep = top_k(scores, self.k, groups, self.quota)
+        batch = [
+            (-scores[i], self.seen + int(i), groups[i] if groups is not None else None, items[i])
+            for i in keep
+        ]
+        self.seen += len(scores)
+
+        previous, self.best = self.best, []
+        counts = Counter()
+        for entry in heapq.merge(previous, batch):
+            if self.quota is not None and groups is not None:
+                if counts[entry[2]] >= self.quota:
+                    continue
+                counts[entry[2]] += 1
+            self.best.append(entry)
+            if len(self.best) == self.k:
+                break
+
+    def results(self) -> list:
+        """
+        (item, score) pairs, best first.
+        """
+        return [(item, -neg_score) for neg_score, _, _, item in self.best]
+
+@instrument.instrumented("rank.select")
+def select(sections, embeddings, persona_query, query_vec=None, lexical_scores=None,
+           k: int = DEFAULT_TOP_K, quota: int = None):
+    """
+    Select top-ranked sections based on persona query embedding.
+    Improved to better match persona requirements.
+    Pass query_vec to reuse an already encoded query_text(persona_query), and
+    lexical_scores to reuse BM25 scores from an index built over a larger
+    corpus; otherwise a BM25 index is built over these sections alone.
+    Returns the k best sections ranked 1..k; with quota, at most quota of
+    them come from any one section["document"].
+    """
+    if query_vec is None:
+        # Encode the enhanced query
+        from .embed import encode
+        query_vec = encode([query_text(persona_query)])[0]
+    if lexical_scores is None:
+        bm25 = BM25Index.build([s["text"] for s in sections])
+        lexical_scores = bm25.score(query_text(persona_query))
+
+    scores = hybrid_score(query_vec, embeddings, lexical_scores)
+    groups = [s.get("document") for s in sections] if quota is not None else None
+    selected = [sections[i] for i in top_k(scores, k, groups, quota)]
+
     # Assign importance rank
-    for rank, (sec, _) in enumerate(ranked, start=1):
+    for rank, sec in enumerate(selected, start=1):
         sec["importance_rank"] = rank
-    
-    return [sec for sec, _ in ranked[:5]]
\ No newline at end of file
+
+    return selected
@@ -0,0 +1,191 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+import argparse
+import json
+import os
+import socketserver
+import threading
+import time
+from . import loader, rank, summarise
+
+class QueueFull(Exception):
+    pass
+
+class BadJob(ValueError):
+    """
+    The job itself is invalid (answered with 400, not 500).
+    """
+
+class JobRunner:
+    """
+    Runs jobs with at most max_concurrent in flight; up to max_queue more
+    wait for a slot, and further submissions are rejected with QueueFull.
+    """
+
+    def __init__(self, run_job, max_concurrent: int = 1, max_queue: int = 16):
+        self.run_job = run_job
+        self.max_queue = max_queue
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self.running = 0
+        self.waiting = 0
+        self.completed = 0
+        self.failed = 0
+
+    def submit(self, job: dict) -> dict:
+        with self._lock:
+            if self.waiting >= self.max_queue:
+                raise QueueFull(f"{self.waiting} jobs already queued")
+            self.waiting += 1
+        start = time.perf_counter()
+        self._slots.acquire()
+        queued = time.perf_counter() - start
+        with self._lock:
+            self.waiting -= 1
+            self.running += 1
+
+        ok = False
+        try:
+            result = self.run_job(job)
+            ok = True
+        finally:
+            self._slots.release()
+            with self._lock:
+                self.running -= 1
+                self.completed += ok
+                self.failed += not ok
+
+        timings = result.setdefault("timings", {})
+        timings["queued"] = queued
+        timings["total"] = time.perf_counter() - start
+        return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"running": self.running, "queued": self.waiting,
+                    "completed": self.completed, "failed": self.failed}
+
+def process_job(job: dict) -> dict:
+    """
+    Run main.process for one {"collection_path", "output_dir", ...} job.
+    """
+    from . import main
+
+    collection_path = Path(job["collection_path"])
+    output_dir = Path(job["output_dir"])
+    if not (collection_path / "challenge1b_input.json").is_file():
+        raise BadJob(f"{collection_path} has no challenge1b_input.json")
+
+    timings = main.process(
+        collection_path,
+        output_dir,
+        loader_backend=job.get("loader", loader.DEFAULT_BACKEND),
+        summary_batch_size=job.get("summary_batch_size", summarise.DEFAULT_BATCH_SIZE),
+        top_k=job.get("top_k", rank.DEFAULT_TOP_K),
+    )
+    return {"output": str(output_dir / "challenge1b_output.json"), "timings": timings}
+
+def warm_models():
+    """
+    Build both models up front so the first job does not pay for loading them.
+    """
+    from . import embed
+
+    embed.model.get()
+    summarise.t5.get()
+
+class Handler(BaseHTTPRequestHandler):
+    """
+    POST /process  {"collection_path": ..., "output_dir": ..., "loader"?,
+                    "summary_batch_size"?, "top_k"?}
+    GET  /health
+    """
+
+    def do_GET(self):
+        if self.path != "/health":
+            return self.reply(404, {"error": f"no route {self.path}"})
+        self.reply(200, dict(self.server.runner.stats(), status="ok"))
+
+    def do_POST(self):
+        if self.path != "/process":
+            return self.reply(404, {"error": f"no route {self.path}"})
+        try:
+            job = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        except ValueError as e:
+            return self.reply(400, {"error": f"invalid JSON: {e}"})
+        if not isinstance(job, dict) or not {"collection_path", "output_dir"} <= job.keys():
+            return self.reply(400, {"error": "job needs collection_path and output_dir"})
+
+        try:
+            result = self.server.runner.submit(job)
+        except QueueFull as e:
+            return self.reply(503, {"error": str(e)})
+        except BadJob as e:
+            return self.reply(400, {"error": str(e)})
+        except Exception as e:
+            return self.reply(500, {"error": repr(e)})
+        self.reply(200, dict(result, status="ok"))
+
+    def reply(self, code: int, body: dict):
+        payload = json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def address_string(self):
+        # Unix socket peers have no (host, port) address
+        return self.client_address[0] if self.client_address else "unix"
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+def make_server(runner: JobRunner, host: str = "127.0.0.1", port: int = 8765, socket_path: Path = None):
+    """
+    HTTP server on a Unix socket if socket_path is given, else on host:port.
+    """
+    if socket_path is not None:
+        Path(socket_path).unlink(missing_ok=True)
+        server = UnixHTTPServer(str(socket_path), Handler)
+    else:
+        server = ThreadingHTTPServer((host, port), Handler)
+    server.runner = runner
+    return server
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.server",
+                                     description="Serve process() jobs with the models kept loaded.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--socket", type=Path, default=None, help="listen on this Unix socket instead of TCP")
+    parser.add_argument("--max-concurrent", type=int, default=1,
+                        help="jobs processed at once (default: %(default)s)")
+    parser.add_argument("--max-queue", type=int, default=16,
+                        help="jobs allowed to wait before new ones get 503 (default: %(default)s)")
+    parser.add_argument("--threads", type=int, default=None,
+                        help="torch intra-op threads (default: torch's own choice)")
+    parser.add_argument("--no-warm", action="store_true", help="load models on the first job instead of at startup")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    summarise.set_threads(args.threads)
+    if not args.no_warm:
+        warm_models()
+
+    runner = JobRunner(process_job, max_concurrent=args.max_concurrent, max_queue=args.max_queue)
+    server = make_server(runner, args.host, args.port, args.socket)
+    where = args.socket or f"http://{args.host}:{args.port}"
+    print(f"Serving on {where} (pid {os.getpid()})", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if args.socket is not None:
+            args.socket.unlink(missing_ok=True)
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,84 @@
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+import os
 import re
+from .lazy import Lazy
+from . import backends, instrument
 
-tokenizer = AutoTokenizer.from_pretrained("t5-small")
-model = AutoModelForSeq2SeqLM.from_pretrained("t5-small")
+MODEL_NAME = "t5-small"
+DEFAULT_BATCH_SIZE = 8
+
+# Backend and model location, see backends.py
+BACKEND = os.environ.get("PDI_SUMMARY_BACKEND", backends.DEFAULT_BACKEND)
+MODEL_PATH = os.environ.get("PDI_SUMMARY_MODEL", MODEL_NAME)
+
+def load_t5(backend: str = None, path: str = None):
+    """
+    (tokenizer, model) for the given backend and path (default: BACKEND, MODEL_PATH).
+    """
+    backend = backends.check(backend or BACKEND)
+    path = path or MODEL_PATH
+    if backends.is_onnx(backend):
+        if path == MODEL_NAME:
+            raise ValueError(f"The {backend} backend loads an export directory; set PDI_SUMMARY_MODEL")
+        return backends.load_onnx_seq2seq(path, backend)
+    from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+
+    model = AutoModelForSeq2SeqLM.from_pretrained(path)
+    return AutoTokenizer.from_pretrained(path), backends.quantize_int8(model) if backend == "int8" else model
+
+t5 = Lazy(load_t5)
+
+def prompt(section):
+    # Pre-trim long text
+    return "summarize: " + section["text"][:2000]
+
+def set_threads(num_threads: int = None):
+    """
+    Set torch's intra-op thread count. The setting is process-wide, so
+    entry points call this once at startup, never per batch.
+    """
+    if num_threads:
+        import torch
+
+        torch.set_num_threads(num_threads)
 
 def refine(section):
     """
     Summarize section text using T5-small.
     """
-    text = section["text"]
-    # Pre-trim long text
-    text = text[:2000]
-
-    # Summarize
-    inputs = tokenizer("summarize: " + text, return_tensors="pt", truncation=True)
-    summary_ids = model.generate(inputs["input_ids"], max_length=150, min_length=30)
-    summary = tokenizer.decode(summary_ids[0], skip_special_tokens=True)
-    section["subsection"] = {"refined_text": summary[:800]}
-    return section
\ No newline at end of file
+    return refine_batch([section], batch_size=1)[0]
+
+@instrument.instrumented("summarise.refine_batch")
+def refine_batch(sections, batch_size: int = DEFAULT_BATCH_SIZE, model=None):
+    """
+    Summarize many sections with batched T5-small generation.
+    Sections are sorted by token length so each batch pads as little as
+    possible; summaries are written back in the original order and match
+    refine() section by section. model is a (tokenizer, model) pair from
+    load_t5, by default the shared one.
+    """
+    if not sections:
+        return sections
+    import torch
+
+    tokenizer, model = model or t5.get()
+
+    prompts = [prompt(s) for s in sections]
+    lengths = [len(ids) for ids in tokenizer(prompts, truncation=True)["input_ids"]]
+    instrument.count("sections_summarised", len(sections))
+    instrument.count("tokens_summarised", sum(lengths))
+    order = sorted(range(len(sections)), key=lambda i: lengths[i])
+
+    with torch.inference_mode():
+        for start in range(0, len(order), batch_size):
+            batch = order[start:start + batch_size]
+            inputs = tokenizer([prompts[i] for i in batch], return_tensors="pt", truncation=True, padding=True)
+            summary_ids = model.generate(
+                inputs["input_ids"],
+                attention_mask=inputs["attention_mask"],
+                max_length=150,
+                min_length=30
+            )
+            summaries = tokenizer.batch_decode(summary_ids, skip_special_tokens=True)
+            for i, summary in zip(batch, summaries):
+                sections[i]["subsection"] = {"refined_text": summary[:800]}
+    return sections
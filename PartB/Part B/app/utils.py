@@ -1,5 +1,8 @@
 import json
+import time
+from contextlib import contextmanager
 from pathlib import Path
+from . import instrument
 
 def load_persona(persona_path: Path):
     """
@@ -11,6 +14,7 @@ def load_persona(persona_path: Path):
     job = data.get('job_to_be_done', '')
     return persona, job
 
+@instrument.instrumented("utils.section_slices")
 def section_slices(blocks, outline):
     """
     Merge blocks between headings into section chunks.
@@ -29,4 +33,16 @@ def section_slices(blocks, outline):
             "title": heading["title"],
             "text": text
         })
-    return sections
\ No newline at end of file
+    instrument.count("sections", len(sections))
+    return sections
+
+@contextmanager
+def timed(timings: dict, stage: str):
+    """
+    Add the wall time of the with-block to timings[stage], in seconds.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - start
@@ -0,0 +1,87 @@
+import argparse
+import copy
+import time
+from pathlib import Path
+import numpy as np
+from app import backends, embed, summarise
+from app.main import extract_sections
+
+BASE_PATH = Path(__file__).resolve().parent.parent
+COLLECTION = BASE_PATH / "Challenge_1b" / "Collection 1"
+
+def sample_sections(collection: Path, n: int):
+    sections = []
+    for pdf_file in sorted((collection / "PDFs").glob("*.pdf")):
+        sections.extend(extract_sections(pdf_file))
+    return [{"text": s["text"], "page": s["page"], "title": s["title"]} for s in sections[:n]]
+
+def timed(fn, repeats: int):
+    """
+    (result of the last call, seconds of each call) after one warm-up call.
+    """
+    result = fn()
+    seconds = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        seconds.append(time.perf_counter() - start)
+    return result, seconds
+
+def bench_embed(backend, path, texts, batch_size, repeats, reference):
+    start = time.perf_counter()
+    model = embed.load_model(backend, path)
+    load = time.perf_counter() - start
+    vectors, seconds = timed(lambda: model.encode(texts, normalize_embeddings=True, batch_size=batch_size,
+                                                   show_progress_bar=False), repeats)
+    parity = backends.cosine_parity(reference, vectors).mean() if reference is not None else 1.0
+    return vectors, load, float(np.median(seconds)), parity
+
+def bench_summary(backend, path, sections, batch_size, repeats, reference):
+    start = time.perf_counter()
+    model = summarise.load_t5(backend, path)
+    load = time.perf_counter() - start
+    result, seconds = timed(lambda: summarise.refine_batch(copy.deepcopy(sections), batch_size=batch_size,
+                                                           model=model), repeats)
+    summaries = [s["subsection"]["refined_text"] for s in result]
+    parity = (np.mean([backends.summary_overlap(r, c) for r, c in zip(reference, summaries)])
+              if reference is not None else 1.0)
+    return summaries, load, float(np.median(seconds)), parity
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput, latency and parity of the inference backends.")
+    parser.add_argument("--collection", type=Path, default=COLLECTION)
+    parser.add_argument("--backends", nargs="+", choices=backends.BACKENDS, default=list(backends.BACKENDS),
+                        help="backends to compare with torch; onnx* ones need the export directories")
+    parser.add_argument("--embed-onnx", default=None, help="ONNX export of the embedding model")
+    parser.add_argument("--summary-onnx", default=None, help="ONNX export of the summary model")
+    parser.add_argument("--texts", type=int, default=256, help="sections embedded per run (default: %(default)s)")
+    parser.add_argument("--summaries", type=int, default=16,
+                        help="sections summarised per run (default: %(default)s)")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--threads", type=int, default=None, help="torch intra-op threads")
+    args = parser.parse_args()
+
+    summarise.set_threads(args.threads)
+    sections = sample_sections(args.collection, max(args.texts, args.summaries))
+    texts = [s["text"] for s in sections[:args.texts]]
+    sections = sections[:args.summaries]
+    paths = {"embed": args.embed_onnx, "summary": args.summary_onnx}
+    # torch first: it is the reference for parity
+    names = ["torch"] + [b for b in args.backends if b != "torch"]
+
+    print(f"{'model':<9}{'backend':<11}{'load s':>8}{'run s':>8}{'items/s':>9}{'ms/item':>9}{'parity':>8}")
+    for kind, items, bench, batch_size in (("embed", texts, bench_embed, 64),
+                                           ("summary", sections, bench_summary, summarise.DEFAULT_BATCH_SIZE)):
+        reference = None
+        for backend in names:
+            path = paths[kind] if backends.is_onnx(backend) else None
+            if backends.is_onnx(backend) and path is None:
+                print(f"{kind:<9}{backend:<11}  skipped: pass --{kind}-onnx")
+                continue
+            output, load, seconds, parity = bench(backend, path, items, batch_size, args.repeats, reference)
+            reference = output if reference is None else reference
+            print(f"{kind:<9}{backend:<11}{load:>8.2f}{seconds:>8.2f}{len(items) / seconds:>9.1f}"
+                  f"{1e3 * seconds / len(items):>9.1f}{parity:>8.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+import argparse
+import json
+import math
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from app.main import DEFAULT_PARSE_WORKERS, add_pipeline_options
+
+BASE_PATH = Path(__file__).resolve().parent.parent
+COLLECTIONS = BASE_PATH / "Challenge_1b"
+BASELINE_PATH = Path(__file__).resolve().parent / "baseline.json"
+
+def normalize_title(title: str) -> str:
+    return " ".join(re.findall(r"[a-z0-9]+", title.lower()))
+
+def same_section(expected: dict, actual: dict) -> bool:
+    if expected["document"] != actual["document"]:
+        return False
+    a, b = normalize_title(expected["section_title"]), normalize_title(actual["section_title"])
+    return bool(a and b) and (a == b or a in b or b in a)
+
+def ndcg(gains, n_relevant: int) -> float:
+    """
+    Binary-relevance NDCG of a ranked list of 0/1 gains, with n_relevant
+    relevant items in existence.
+    """
+    dcg = sum(gain / math.log2(i + 2) for i, gain in enumerate(gains))
+    idcg = sum(1 / math.log2(i + 2) for i in range(min(n_relevant, len(gains))))
+    return dcg / idcg if idcg else 0.0
+
+def relevance(expected: dict, actual: dict) -> dict:
+    """
+    Compare extracted_sections with the shipped reference output.
+    section_recall: share of reference sections found anywhere in ours.
+    ndcg: importance_rank is per document, so each document's sections are
+    scored against that document's reference sections (binary-relevance
+    NDCG over our ranking), then averaged over the reference documents.
+    """
+    reference = expected["extracted_sections"]
+    ours = actual["extracted_sections"]
+    if not reference:
+        return {"section_recall": 1.0, "ndcg": 1.0}
+
+    found = sum(any(same_section(ref, s) for s in ours) for ref in reference)
+    scores = []
+    for document in dict.fromkeys(ref["document"] for ref in reference):
+        relevant = [ref for ref in reference if ref["document"] == document]
+        ranked = sorted((s for s in ours if s["document"] == document), key=lambda s: s["importance_rank"])
+        gains = [any(same_section(ref, s) for ref in relevant) for s in ranked]
+        scores.append(ndcg(gains, len(relevant)))
+    return {"section_recall": found / len(reference), "ndcg": sum(scores) / len(scores)}
+
+def count_pages(collection: Path) -> int:
+    import fitz  # PyMuPDF
+
+    pages = 0
+    for pdf_file in (collection / "PDFs").glob("*.pdf"):
+        with fitz.open(pdf_file) as doc:
+            pages += doc.page_count
+    return pages
+
+def run_collection(collection: Path, cache_dir: str, extra_args) -> dict:
+    """
+    One `python -m app.main --profile` run with PDI_CACHE_DIR=cache_dir.
+    """
+    with tempfile.TemporaryDirectory() as output_dir:
+        env = dict(os.environ, PDI_CACHE_DIR=cache_dir)
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-m", "app.main", str(collection), output_dir, "--profile", *extra_args],
+                       cwd=BASE_PATH, env=env, check=True, capture_output=True)
+        wall = time.perf_counter() - start
+        profile = json.loads((Path(output_dir) / "profile.json").read_text())
+        output = json.loads((Path(output_dir) / "challenge1b_output.json").read_text())
+
+    stages = profile["pipeline_stages"]
+    return {
+        "wall_seconds": wall,
+        "process_seconds": sum(stages.values()),
+        "stages": stages,
+        "peak_rss_mb": profile["peak_rss_bytes"] / 2**20,
+        "counters": profile["counters"],
+        "output": output,
+    }
+
+def benchmark(collections, extra_args) -> dict:
+    """
+    Cold (empty caches) then warm (same caches) run of every collection.
+    """
+    results = {}
+    for collection in collections:
+        pages = count_pages(collection)
+        expected = json.loads((collection / "challenge1b_output.json").read_text())
+        with tempfile.TemporaryDirectory() as cache_dir:
+            for mode in ("cold", "warm"):
+                run = run_collection(collection, cache_dir, extra_args)
+                output = run.pop("output")
+                run["pages"] = pages
+                run["pages_per_second"] = pages / run["process_seconds"]
+                run["relevance"] = relevance(expected, output)
+                results[f"{collection.name}/{mode}"] = run
+    return results
+
+def compare(results: dict, baseline: dict, threshold: float, relevance_tolerance: float) -> list:
+    """
+    Regressions against the baseline: process time more than threshold
+    slower, or a relevance metric more than relevance_tolerance lower.
+    """
+    regressions = []
+    for key, run in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        limit = base["process_seconds"] * (1 + threshold)
+        if run["process_seconds"] > limit:
+            regressions.append(f"{key}: {run['process_seconds']:.2f}s > {limit:.2f}s "
+                               f"(baseline {base['process_seconds']:.2f}s +{threshold:.0%})")
+        for metric, value in run["relevance"].items():
+            if value < base["relevance"][metric] - relevance_tolerance:
+                regressions.append(f"{key}: {metric} {value:.3f} < baseline {base['relevance'][metric]:.3f}")
+    return regressions
+
+def print_table(results: dict) -> None:
+    print(f"{'run':<20}{'wall s':>8}{'proc s':>8}{'extract':>9}{'embed':>8}{'rank':>7}{'summ':>7}"
+          f"{'pages/s':>9}{'RSS MB':>8}{'recall':>8}{'ndcg':>7}")
+    for key, run in results.items():
+        stages = run["stages"]
+        print(f"{key:<20}{run['wall_seconds']:>8.2f}{run['process_seconds']:>8.2f}"
+              f"{stages.get('extract', 0):>9.2f}{stages.get('embed', 0):>8.2f}{stages.get('rank', 0):>7.2f}"
+              f"{stages.get('summarise', 0):>7.2f}{run['pages_per_second']:>9.1f}{run['peak_rss_mb']:>8.0f}"
+              f"{run['relevance']['section_recall']:>8.2f}{run['relevance']['ndcg']:>7.2f}")
+
+def pipeline_args(args) -> list:
+    """
+    app.main flags matching the pipeline options given to the benchmark.
+    """
+    extra_args = ["--loader", args.loader, "--summary-batch-size", str(args.summary_batch_size),
+                  "--top-k", str(args.top_k), "--parse-workers", str(args.parse_workers)]
+    if args.threads:
+        extra_args += ["--threads", str(args.threads)]
+    return extra_args
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="End-to-end benchmark of app.main over the bundled collections.")
+    parser.add_argument("collections", nargs="*", type=Path,
+                        help="collection directories (default: every bundled collection)")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--write-baseline", action="store_true",
+                        help="store these results as the new baseline instead of comparing with it")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="allowed slowdown of process time vs baseline (default: %(default)s)")
+    parser.add_argument("--relevance-tolerance", type=float, default=0.0,
+                        help="allowed drop of recall/NDCG vs baseline (default: %(default)s)")
+    parser.add_argument("--json", type=Path, default=None, help="also write the full results here")
+    add_pipeline_options(parser)
+    parser.add_argument("--parse-workers", type=int, default=DEFAULT_PARSE_WORKERS,
+                        help="app.main --parse-workers (default: sequential)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    # Checked before the (slow) runs: without a baseline there is nothing to gate on
+    if not args.write_baseline and not args.baseline.exists():
+        sys.exit(f"No baseline at {args.baseline}; run with --write-baseline to record one")
+    extra_args = pipeline_args(args)
+
+    collections = args.collections or sorted(p.parent for p in COLLECTIONS.glob("*/challenge1b_input.json"))
+    results = benchmark(collections, extra_args)
+    print_table(results)
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+
+    if args.write_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    regressions = compare(results, json.loads(args.baseline.read_text()), args.threshold, args.relevance_tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if regressions:
+        sys.exit(1)
+    print("No regressions against baseline")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import argparse
+import time
+from pathlib import Path
+from app import loader
+
+BASE_PATH = Path(__file__).resolve().parent.parent
+COLLECTIONS = BASE_PATH / "Challenge_1b"
+
+def run(pdf_files, backend):
+    """
+    Parse every PDF uncached with one backend; return (seconds, pages, blocks).
+    """
+    start = time.perf_counter()
+    pages = blocks = 0
+    for pdf_file in pdf_files:
+        result = loader.load(pdf_file, backend=backend, use_cache=False)
+        pages += max((b["page"] for b in result), default=0)
+        blocks += len(result)
+    return time.perf_counter() - start, pages, blocks
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-page parsing throughput of the loader backends.")
+    parser.add_argument("--collection", type=Path, default=None,
+                        help="collection directory (default: every bundled collection)")
+    args = parser.parse_args()
+
+    pattern = "PDFs/*.pdf" if args.collection else "*/PDFs/*.pdf"
+    pdf_files = sorted((args.collection or COLLECTIONS).glob(pattern))
+    print(f"{len(pdf_files)} PDFs")
+    print(f"{'backend':<10}{'seconds':>10}{'pages':>8}{'blocks':>8}{'pages/s':>10}{'ms/page':>10}")
+
+    results = {}
+    for backend in loader.BACKENDS:
+        seconds, pages, blocks = run(pdf_files, backend)
+        results[backend] = seconds
+        print(f"{backend:<10}{seconds:>10.2f}{pages:>8}{blocks:>8}{pages / seconds:>10.1f}{1e3 * seconds / pages:>10.2f}")
+
+    print(f"pymupdf speedup: {results['pdfminer'] / results['pymupdf']:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_PATH = Path(__file__).resolve().parent.parent
+COLLECTIONS = BASE_PATH / "Challenge_1b"
+STAGES = ["extract", "embed", "rank", "summarise", "output"]
+
+# Drain pipeline.parsed_documents over a collection (no models needed)
+PARSE_ONLY = """
+import sys
+from pathlib import Path
+from app import pipeline
+pdf_files = sorted((Path(sys.argv[1]) / "PDFs").glob("*.pdf"))
+for _ in pipeline.parsed_documents(pdf_files, workers=int(sys.argv[2])):
+    pass
+"""
+
+def run(collection, extra_args):
+    """
+    One cold `python -m app.main --profile` run (fresh parse and embedding
+    caches); returns (wall seconds, seconds per stage).
+    """
+    with tempfile.TemporaryDirectory() as cache_dir, tempfile.TemporaryDirectory() as output_dir:
+        env = dict(os.environ, PDI_CACHE_DIR=cache_dir)
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-m", "app.main", str(collection), output_dir, "--profile", *extra_args],
+                       cwd=BASE_PATH, env=env, check=True, capture_output=True)
+        wall = time.perf_counter() - start
+        profile = json.loads((Path(output_dir) / "profile.json").read_text())
+    return wall, profile["pipeline_stages"]
+
+def run_parse_only(collection, workers):
+    """
+    One cold parse of every PDF through parsed_documents; returns (wall seconds, {}).
+    """
+    with tempfile.TemporaryDirectory() as cache_dir:
+        env = dict(os.environ, PDI_CACHE_DIR=cache_dir)
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", PARSE_ONLY, str(collection), str(workers)],
+                       cwd=BASE_PATH, env=env, check=True, capture_output=True)
+        return time.perf_counter() - start, {}
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end collection latency: sequential vs pipelined stages.")
+    parser.add_argument("--collection", type=Path, default=COLLECTIONS / "Collection 1")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--parse-workers", type=int, nargs="+", default=[2, 4])
+    parser.add_argument("--summary-workers", type=int, default=1)
+    parser.add_argument("--parse-only", action="store_true",
+                        help="only time parsing (inline vs worker processes); needs no models")
+    args = parser.parse_args()
+
+    variants = {"sequential": 0}
+    for workers in args.parse_workers:
+        variants[f"pipelined x{workers}"] = workers
+
+    print(f"{args.collection.name}: {len(list((args.collection / 'PDFs').glob('*.pdf')))} PDFs, "
+          f"{args.repeat} cold runs each, {os.cpu_count()} CPUs" + (", parsing only" if args.parse_only else ""))
+    stage_columns = [] if args.parse_only else STAGES
+    print(f"{'variant':<16}{'median s':>10}{'min s':>10}{'speedup':>10}" + "".join(f"{s:>11}" for s in stage_columns))
+    baseline = None
+    for name, workers in variants.items():
+        if args.parse_only:
+            runs = [run_parse_only(args.collection, workers) for _ in range(args.repeat)]
+        else:
+            extra_args = ["--parse-workers", str(workers), "--summary-workers", str(args.summary_workers)] if workers else []
+            runs = [run(args.collection, extra_args) for _ in range(args.repeat)]
+        times = [wall for wall, _ in runs]
+        median = statistics.median(times)
+        baseline = baseline or median
+        stages = "".join(f"{statistics.median(s.get(stage, 0.0) for _, s in runs):>11.2f}" for stage in stage_columns)
+        print(f"{name:<16}{median:>10.2f}{min(times):>10.2f}{baseline / median:>9.2f}x{stages}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BASE_PATH = Path(__file__).resolve().parent.parent
+
+def import_times(module):
+    """
+    Run `python -X importtime -c "import <module>"` in a fresh interpreter;
+    return {module name: (self us, cumulative us)}.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BASE_PATH, capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+def wall_time(argv):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, *argv], cwd=BASE_PATH, capture_output=True)
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start import cost of the PartB entry points.")
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="heaviest imports to list")
+    parser.add_argument("--budget-ms", type=float, default=None,
+                        help="exit non-zero if the median import time exceeds this")
+    args = parser.parse_args()
+
+    runs = [import_times(args.module) for _ in range(args.repeat)]
+    totals = [run[args.module][1] / 1e3 for run in runs]
+    median = statistics.median(totals)
+
+    print(f"import {args.module}: median {median:.1f} ms over {args.repeat} runs "
+          f"(min {min(totals):.1f}, max {max(totals):.1f})")
+    print(f"{'module':<50}{'self ms':>10}{'cumul ms':>10}")
+    heaviest = sorted(runs[-1].items(), key=lambda item: -item[1][1])[:args.top]
+    for name, (self_us, cumulative_us) in heaviest:
+        print(f"{name:<50}{self_us / 1e3:>10.1f}{cumulative_us / 1e3:>10.1f}")
+
+    help_time = statistics.median(wall_time(["-m", "app.main", "--help"]) for _ in range(args.repeat))
+    print(f"python -m app.main --help: {help_time * 1e3:.0f} ms wall")
+
+    if args.budget_ms is not None and median > args.budget_ms:
+        print(f"FAIL: {median:.1f} ms exceeds budget of {args.budget_ms:.1f} ms")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import copy
+import os
+import numpy as np
+import pytest
+from pathlib import Path
+from app import backends, embed, loader, summarise
+
+BASE_PATH = Path(__file__).resolve().parent.parent
+PDF_PATH = BASE_PATH / "Challenge_1b" / "Collection 1" / "PDFs" / "South of France - Cuisine.pdf"
+
+# Minimum mean cosine / unigram F1 against the fp32 torch path
+EMBED_PARITY = {"int8": 0.98, "onnx": 0.999, "onnx-int8": 0.98}
+SUMMARY_PARITY = {"int8": 0.5, "onnx": 0.9, "onnx-int8": 0.5}
+
+def model_path(kind, backend):
+    """
+    Path to load the backend from, or skip: ONNX backends need an export
+    (python -m app.backends <kind> DIR) named by PDI_TEST_<KIND>_ONNX.
+    """
+    pytest.importorskip("torch")
+    if not backends.is_onnx(backend):
+        return None
+    pytest.importorskip("onnxruntime")
+    directory = os.environ.get(f"PDI_TEST_{kind.upper()}_ONNX")
+    if not directory:
+        pytest.skip(f"PDI_TEST_{kind.upper()}_ONNX is not set")
+    return directory
+
+def sample_texts(n=16):
+    blocks = loader.load(PDF_PATH)
+    return [" ".join(b["text"] for b in blocks[i:i + 3]) for i in range(0, 3 * n, 3)]
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        backends.check("tensorrt")
+    assert backends.onnx_file("decoder_model", "onnx-int8") == "decoder_model_quantized.onnx"
+    assert backends.onnx_file("model", "onnx") == "model.onnx"
+
+def test_parity_metrics():
+    vectors = np.random.default_rng(0).normal(size=(4, 8))
+    assert np.allclose(backends.cosine_parity(vectors, 2 * vectors), 1)
+    assert np.allclose(backends.cosine_parity(vectors, -vectors), -1)
+
+    assert backends.summary_overlap("The old town, by the sea.", "the old town by the sea") == 1
+    assert backends.summary_overlap("a b c d", "a b x y") == 0.5
+    assert backends.summary_overlap("a b", "") == 0
+
+def test_backends_and_checkpoints_keep_separate_embedding_stores(tmp_path, monkeypatch):
+    monkeypatch.setattr(embed, "BACKEND", "torch")
+    monkeypatch.setattr(embed, "MODEL_PATH", embed.MODEL_NAME)
+    assert embed.store_name() == embed.MODEL_NAME
+
+    names = set()
+    for backend in ["torch", "onnx-int8"]:
+        for path in [tmp_path / "export-a", tmp_path / "export-b"]:
+            path.mkdir(exist_ok=True)
+            monkeypatch.setattr(embed, "BACKEND", backend)
+            monkeypatch.setattr(embed, "MODEL_PATH", str(path))
+            names.add(embed.store_name())
+    assert len(names) == 4 and embed.MODEL_NAME not in names
+
+    # Relative and absolute spellings of one directory share a store
+    absolute = embed.store_name()
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(embed, "MODEL_PATH", "export-b")
+    assert embed.store_name() == absolute
+
+def test_load_model_rejects_other_embedding_sizes(monkeypatch):
+    class WideEncoder:
+        def __init__(self, path, backend):
+            pass
+
+        def get_sentence_embedding_dimension(self):
+            return 768
+
+    monkeypatch.setattr(backends, "OnnxEncoder", WideEncoder)
+    with pytest.raises(ValueError, match="768"):
+        embed.load_model("onnx", "/models/mpnet-onnx")
+
+@pytest.mark.parametrize("backend", ["int8", "onnx", "onnx-int8"])
+def test_embedding_parity(backend):
+    path = model_path("embed", backend)
+    pytest.importorskip("sentence_transformers")
+    texts = sample_texts()
+    reference = embed.load_model("torch").encode(texts, normalize_embeddings=True)
+    candidate = embed.load_model(backend, path).encode(texts, normalize_embeddings=True)
+
+    assert candidate.shape == (len(texts), embed.EMBEDDING_DIM)
+    assert backends.cosine_parity(reference, candidate).mean() >= EMBED_PARITY[backend]
+
+@pytest.mark.parametrize("backend", ["int8", "onnx", "onnx-int8"])
+def test_summary_parity(backend):
+    path = model_path("summary", backend)
+    pytest.importorskip("transformers")
+    sections = [{"text": text, "page": 1, "title": text[:40]} for text in sample_texts(6)]
+    reference = summarise.refine_batch(copy.deepcopy(sections), model=summarise.load_t5("torch"))
+    candidate = summarise.refine_batch(copy.deepcopy(sections), model=summarise.load_t5(backend, path))
+
+    overlaps = [backends.summary_overlap(r["subsection"]["refined_text"], c["subsection"]["refined_text"])
+                for r, c in zip(reference, candidate)]
+    assert np.mean(overlaps) >= SUMMARY_PARITY[backend]
@@ -0,0 +1,35 @@
+import shutil
+from pathlib import Path
+from app import batch
+
+BASE_PATH = Path(__file__).resolve().parent.parent
+SOURCE = BASE_PATH / "Challenge_1b" / "Collection 1"
+PDFS = ["South of France - Cuisine.pdf", "South of France - History.pdf", "South of France - Traditions and Culture.pdf"]
+
+def make_collection(root, name, pdfs, renamed=None):
+    collection = root / name
+    (collection / "PDFs").mkdir(parents=True)
+    shutil.copy(SOURCE / "challenge1b_input.json", collection)
+    for pdf in pdfs:
+        shutil.copy(SOURCE / "PDFs" / pdf, collection / "PDFs" / (renamed or {}).get(pdf, pdf))
+    return collection
+
+def test_resolve_collections(tmp_path):
+    first = make_collection(tmp_path, "Collection A", [])
+    second = make_collection(tmp_path, "Collection B", [])
+    (tmp_path / "Not a collection").mkdir()
+
+    assert batch.resolve_collections([tmp_path / "Collection *"]) == [first, second]
+    assert batch.resolve_collections([second, str(tmp_path / "*"), second]) == [second, first]
+
+def test_shared_pdfs_are_extracted_once(tmp_path):
+    first = make_collection(tmp_path, "Collection A", PDFS[:2])
+    # Same content under another file name still counts as the same PDF
+    second = make_collection(tmp_path, "Collection B", PDFS[1:], renamed={PDFS[1]: "history-copy.pdf"})
+
+    plans, unique = batch.plan_collections([first, second])
+    assert len(unique) == 3
+    assert [len(pdfs) for _, _, pdfs in plans] == [2, 2]
+    assert {pdf.name for pdf, _ in plans[1][2]} == {"history-copy.pdf", PDFS[2]}
+    shared = {d for _, d in plans[0][2]} & {d for _, d in plans[1][2]}
+    assert len(shared) == 1
@@ -0,0 +1,87 @@
+import json
+import math
+import numpy as np
+import pytest
+from pathlib import Path
+from app import embed, main, summarise
+from benchmarks import bench_collections
+
+BASE_PATH = Path(__file__).resolve().parent.parent
+EXPECTED_PATH = BASE_PATH / "Challenge_1b" / "Collection 1" / "challenge1b_output.json"
+
+def section(document, title, rank):
+    return {"document": document, "section_title": title, "importance_rank": rank, "page_number": 1}
+
+def test_reference_output_scores_perfectly():
+    expected = json.loads(EXPECTED_PATH.read_text())
+    assert bench_collections.relevance(expected, expected) == {"section_recall": 1.0, "ndcg": 1.0}
+
+def test_relevance_matches_titles_loosely():
+    expected = {"extracted_sections": [section("a.pdf", "Coastal Adventures", 1), section("b.pdf", "Nightlife", 2)]}
+    actual = {"extracted_sections": [
+        section("a.pdf", "Coastal adventures:", 1),
+        section("b.pdf", "Nightlife and Entertainment", 1),
+        # Same title in another document does not count
+        section("c.pdf", "Coastal Adventures", 1),
+    ]}
+    assert bench_collections.relevance(expected, actual) == {"section_recall": 1.0, "ndcg": 1.0}
+
+def test_ndcg_follows_the_ranking_within_each_document():
+    expected = {"extracted_sections": [section("a.pdf", "Nightlife", 1), section("b.pdf", "Beaches", 2)]}
+
+    def scores(a_ranks, b_ranks):
+        return bench_collections.relevance(expected, {"extracted_sections": [
+            section("a.pdf", "Introduction", a_ranks[0]),
+            section("a.pdf", "Nightlife", a_ranks[1]),
+            section("b.pdf", "Beaches", b_ranks[0]),
+            section("b.pdf", "Conclusion", b_ranks[1]),
+        ]})
+
+    best = scores([2, 1], [1, 2])
+    # a.pdf's hit drops from rank 1 to rank 2; rank-1 order across documents is unchanged
+    worse = scores([1, 2], [1, 2])
+    assert best["ndcg"] == 1.0
+    assert worse["ndcg"] == pytest.approx((1 + 1 / math.log2(3)) / 2)
+    assert worse["section_recall"] == best["section_recall"] == 1.0
+
+def test_compare_flags_slowdowns_and_relevance_drops():
+    baseline = {"Collection 1/cold": {"process_seconds": 10.0, "relevance": {"section_recall": 0.6, "ndcg": 0.5}}}
+    ok = {"Collection 1/cold": {"process_seconds": 11.0, "relevance": {"section_recall": 0.6, "ndcg": 0.5}}}
+    slow = {"Collection 1/cold": {"process_seconds": 13.0, "relevance": {"section_recall": 0.4, "ndcg": 0.5}}}
+
+    assert bench_collections.compare(ok, baseline, threshold=0.2, relevance_tolerance=0.0) == []
+    regressions = bench_collections.compare(slow, baseline, threshold=0.2, relevance_tolerance=0.0)
+    assert len(regressions) == 2
+    assert bench_collections.compare(slow, {}, threshold=0.2, relevance_tolerance=0.0) == []
+
+def test_missing_baseline_fails_before_running(tmp_path, monkeypatch):
+    def benchmark(collections, extra_args):
+        return {"Collection 1/cold": {"process_seconds": 1.0}}
+
+    monkeypatch.setattr(bench_collections, "benchmark", benchmark)
+    monkeypatch.setattr(bench_collections, "print_table", lambda results: None)
+    baseline = tmp_path / "baseline.json"
+    with pytest.raises(SystemExit, match="--write-baseline") as exit_info:
+        bench_collections.main(["--baseline", str(baseline)])
+    assert exit_info.value.code != 0 and not baseline.exists()
+
+    bench_collections.main(["--baseline", str(baseline), "--write-baseline"])
+    assert json.loads(baseline.read_text()) == benchmark([], [])
+
+def test_pipeline_args_run_the_pipelined_cli_with_a_profile(tmp_path, monkeypatch):
+    # Fake models: this checks the forwarded flags and the profile the benchmark reads
+    monkeypatch.setenv("PDI_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(embed, "encode", lambda texts, use_cache=True: np.eye(len(texts), embed.EMBEDDING_DIM,
+                                                                                dtype=np.float32))
+    monkeypatch.setattr(summarise, "refine_batch", lambda sections, **kwargs: sections)
+
+    bench_args = bench_collections.parse_args(["--parse-workers", "1", "--top-k", "3"])
+    extra_args = bench_collections.pipeline_args(bench_args)
+    assert extra_args[extra_args.index("--parse-workers") + 1] == "1"
+
+    collection = EXPECTED_PATH.parent
+    args = main.parse_args([str(collection), str(tmp_path / "out"), "--profile", *extra_args])
+    main.run(args)
+    profile = json.loads((tmp_path / "out" / "profile.json").read_text())
+    assert profile["pipeline_stages"].keys() == {"extract", "embed", "rank", "summarise", "output"}
+    assert profile["peak_rss_bytes"] > 0
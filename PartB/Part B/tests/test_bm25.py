@@ -0,0 +1,73 @@
+import math
+import os
+import numpy as np
+from app import bm25
+from app.bm25 import BM25Index, load_or_build, tokenize
+from app.rank import hybrid_score
+
+TEXTS = [
+    "Beach activities and water sports along the coast",
+    "Traditional recipes: cooking with local ingredients",
+    "Nightlife, bars and clubs; the coast at night",
+    "",
+    "Packing tips for a coastal trip with kids and the beach",
+]
+
+def bm25_reference(texts, query, k1=1.5, b=0.75):
+    docs = [tokenize(t) for t in texts]
+    avgdl = sum(map(len, docs)) / len(docs)
+    scores = []
+    for doc in docs:
+        score = 0.0
+        for term in tokenize(query):
+            df = sum(term in d for d in docs)
+            if not df:
+                continue
+            idf = math.log(1 + (len(docs) - df + 0.5) / (df + 0.5))
+            tf = doc.count(term)
+            score += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len(doc) / avgdl))
+        scores.append(score)
+    return scores
+
+def test_matches_reference():
+    index = BM25Index.build(TEXTS)
+    for query in ["beach coast", "cooking recipes", "coast coast night", "unknown words"]:
+        assert np.allclose(index.score(query), bm25_reference(TEXTS, query))
+
+def test_depends_on_query():
+    index = BM25Index.build(TEXTS)
+    assert index.score("cooking").argmax() == 1
+    assert index.score("beach").argmax() in (0, 4)
+
+def test_accented_terms():
+    assert tokenize("Crème brûlée, naïve café") == ["crème", "brûlée", "naïve", "café"]
+    index = BM25Index.build(TEXTS + ["Desserts: crème brûlée and tarte tatin"])
+    scores = index.score("crème")
+    assert scores.argmax() == len(TEXTS) and scores[:len(TEXTS)].max() == 0
+
+def test_persisted_once(tmp_path):
+    first = load_or_build(TEXTS, tmp_path)
+    saved = list(tmp_path.glob("*.npz"))
+    assert len(saved) == 1
+
+    again = load_or_build(TEXTS, tmp_path)
+    assert again.vocab == first.vocab
+    assert np.array_equal(again.score("beach coast"), first.score("beach coast"))
+
+def test_persisted_indexes_are_capped(tmp_path, monkeypatch):
+    load_or_build(TEXTS, tmp_path)
+    size = next(tmp_path.glob("*.npz")).stat().st_size
+    monkeypatch.setattr(bm25.cache, "max_bytes", int(2.5 * size))
+    for i in range(4):
+        load_or_build(TEXTS + [f"extra {i}"], tmp_path)
+        for n, path in enumerate(sorted(tmp_path.glob("*.npz"), key=lambda p: p.stat().st_mtime)):
+            os.utime(path, (n, n))  # keep mtimes ordered on coarse-grained filesystems
+
+    saved = {path.stem for path in tmp_path.glob("*.npz")}
+    assert len(saved) == 2
+    assert bm25.corpus_key(TEXTS + ["extra 3"]) in saved
+
+def test_hybrid_score_scales_lexical():
+    vecs = np.eye(3)
+    scores = hybrid_score(vecs[0], vecs, [0.0, 4.0, 2.0])
+    assert np.allclose(scores, [0.6, 0.4, 0.2])
@@ -0,0 +1,70 @@
+import os
+import shutil
+from pathlib import Path
+from app.cache import DiskCache
+from app import loader
+
+BASE_PATH = Path(__file__).resolve().parent.parent
+PDF_PATH = BASE_PATH / "Challenge_1b" / "Collection 1" / "PDFs" / "South of France - Cuisine.pdf"
+OPTIONS = {"parser": "pdfminer"}
+
+def test_roundtrip_and_counters(tmp_path):
+    cache = DiskCache(tmp_path)
+    assert cache.get("a") is None
+    cache.put("a", [{"text": "x"}])
+    assert cache.get("a") == [{"text": "x"}]
+    assert cache.stats() == {"hits": 1, "misses": 1}
+    assert not list(tmp_path.glob(".tmp-*"))
+
+def test_corrupt_entries_are_misses_and_removed(tmp_path):
+    cache = DiskCache(tmp_path)
+    junk_entries = {
+        "unpickling-error": b"Pfoo\n.",
+        "truncated": b"\x80\x04N",
+        "empty": b"",
+        "bad-opcode": b"\x80\x04not a pickle",
+        "bad-frame": b"\x80\x05\x95garbage",
+    }
+    for key, junk in junk_entries.items():
+        cache.path_for(key).write_bytes(junk)
+        assert cache.get(key) is None
+        assert not cache.path_for(key).exists()
+    assert cache.stats() == {"hits": 0, "misses": len(junk_entries)}
+
+def test_lru_eviction(tmp_path):
+    cache = DiskCache(tmp_path, max_bytes=10_000)
+    payload = b"x" * 3_000
+    for age, key in enumerate(["a", "b", "c"]):
+        cache.put(key, payload)
+        os.utime(cache.path_for(key), (1000 + age, 1000 + age))
+    cache.get("a")  # "b" is now least recently used
+    cache.put("d", payload)
+    assert cache.get("b") is None
+    assert cache.get("a") == payload
+    assert cache.get("d") == payload
+
+def test_key_follows_content_not_path(tmp_path):
+    copy = tmp_path / "copy.pdf"
+    shutil.copy(PDF_PATH, copy)
+    assert loader.cache_key(copy, OPTIONS) == loader.cache_key(PDF_PATH, OPTIONS)
+
+    copy.write_bytes(copy.read_bytes() + b"\n%edited")
+    assert loader.cache_key(copy, OPTIONS) != loader.cache_key(PDF_PATH, OPTIONS)
+    assert loader.cache_key(PDF_PATH, {"parser": "pymupdf"}) != loader.cache_key(PDF_PATH, OPTIONS)
+
+def test_load_uses_cache(tmp_path, monkeypatch):
+    cache = DiskCache(tmp_path)
+    monkeypatch.setattr(loader, "cache", cache)
+    blocks = loader.load(PDF_PATH)
+    assert loader.load(PDF_PATH) == blocks
+    assert cache.stats() == {"hits": 1, "misses": 1}
+
+def test_load_reparses_corrupt_entry(tmp_path, monkeypatch):
+    cache = DiskCache(tmp_path)
+    monkeypatch.setattr(loader, "cache", cache)
+    blocks = loader.load(PDF_PATH)
+    (entry,) = tmp_path.glob("*.pkl")
+    entry.write_bytes(entry.read_bytes()[:100])
+    assert loader.load(PDF_PATH) == blocks
+    assert loader.load(PDF_PATH) == blocks
+    assert cache.stats() == {"hits": 1, "misses": 2}
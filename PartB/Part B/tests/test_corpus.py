@@ -0,0 +1,92 @@
+from collections import Counter
+import numpy as np
+import pytest
+from app import corpus
+from app.corpus import CorpusIndex
+
+DIM = 8
+
+def unit(rng, n):
+    vectors = rng.standard_normal((n, DIM)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+def sections_for(doc, n):
+    return [{"document": doc, "title": f"{doc} {i}", "page": i + 1, "level": "H1", "text": f"text {i}"}
+            for i in range(n)]
+
+def test_search_is_global_across_documents(tmp_path):
+    rng = np.random.default_rng(0)
+    index = CorpusIndex(tmp_path, DIM)
+    vectors = {"a.pdf": unit(rng, 5), "b.pdf": unit(rng, 7)}
+    for doc, vecs in vectors.items():
+        index.add_document(doc, doc + "-v1", sections_for(doc, len(vecs)), vecs)
+
+    query = vectors["b.pdf"][3]
+    hits = index.search(query, k=4)
+    assert hits[0]["title"] == "b.pdf 3"
+    assert abs(hits[0]["score"] - 1.0) < 1e-5
+
+    expected = np.concatenate(list(vectors.values())) @ query
+    assert np.allclose([h["score"] for h in hits], np.sort(expected)[::-1][:4], atol=1e-5)
+
+def test_incremental_update_and_reload(tmp_path):
+    rng = np.random.default_rng(1)
+    index = CorpusIndex.open(tmp_path, dim=DIM)
+    index.add_document("a.pdf", "v1", sections_for("a.pdf", 3), unit(rng, 3))
+    index.add_document("b.pdf", "v1", sections_for("b.pdf", 3), unit(rng, 3))
+    index.save()
+
+    reopened = CorpusIndex.open(tmp_path)
+    assert reopened.has_document("a.pdf", "v1")
+    replacement = unit(rng, 2)
+    reopened.add_document("a.pdf", "v2", sections_for("a.pdf", 2), replacement)
+    reopened.remove_document("b.pdf")
+    assert len(reopened) == 2
+
+    hits = reopened.search(replacement[1], k=10)
+    assert [h["title"] for h in hits][0] == "a.pdf 1"
+    assert {h["document"] for h in hits} == {"a.pdf"}
+
+def test_index_kind_follows_size(tmp_path, monkeypatch):
+    monkeypatch.setattr(corpus, "FLAT_MAX", 50)
+    monkeypatch.setattr(corpus, "IVF_MAX", 200)
+    rng = np.random.default_rng(2)
+    index = CorpusIndex(tmp_path, DIM)
+
+    index.add_document("small.pdf", "v1", sections_for("small.pdf", 10), unit(rng, 10))
+    index.ensure_index()
+    assert index.kind == "flat"
+
+    vectors = unit(rng, 100)
+    index.add_document("medium.pdf", "v1", sections_for("medium.pdf", 100), vectors)
+    assert index.search(vectors[42], k=1)[0]["title"] == "medium.pdf 42"
+    assert index.kind == "ivf"
+
+    vectors = unit(rng, 150)
+    index.add_document("large.pdf", "v1", sections_for("large.pdf", 150), vectors)
+    assert index.search(vectors[7], k=1)[0]["title"] == "large.pdf 7"
+    assert index.kind == "hnsw"
+
+    index.remove_document("large.pdf")
+    assert index.search(vectors[7], k=1)[0]["document"] != "large.pdf"
+
+def test_search_quota_per_document(tmp_path):
+    rng = np.random.default_rng(3)
+    index = CorpusIndex(tmp_path, DIM)
+    query = unit(rng, 1)[0]
+    # Every section of a.pdf is closer to the query than anything in b.pdf or c.pdf
+    close = query + 0.05 * unit(rng, 20)
+    index.add_document("a.pdf", "v1", sections_for("a.pdf", 20), close / np.linalg.norm(close, axis=1, keepdims=True))
+    index.add_document("b.pdf", "v1", sections_for("b.pdf", 20), unit(rng, 20))
+    index.add_document("c.pdf", "v1", sections_for("c.pdf", 20), unit(rng, 20))
+
+    assert {h["document"] for h in index.search(query, k=5)} == {"a.pdf"}
+    hits = index.search(query, k=5, quota=2)
+    assert [h["document"] for h in hits][:2] == ["a.pdf", "a.pdf"]
+    counts = Counter(h["document"] for h in hits)
+    assert len(hits) == 5 and max(counts.values()) == 2 and set(counts) == {"a.pdf", "b.pdf", "c.pdf"}
+
+def test_sync_rejects_unknown_loader(tmp_path, capsys):
+    with pytest.raises(SystemExit):
+        corpus.main(["sync", str(tmp_path), str(tmp_path / "index"), "--loader", "pdfplumber"])
+    assert "invalid choice" in capsys.readouterr().err
@@ -0,0 +1,76 @@
+import multiprocessing
+import os
+import numpy as np
+from app.embed_store import EmbeddingStore, text_key
+
+MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+
+def test_add_and_lookup(tmp_path):
+    store = EmbeddingStore(tmp_path, MODEL_NAME, dim=4)
+    keys = [text_key("alpha beta"), text_key("gamma")]
+    vectors = np.arange(8, dtype=np.float32).reshape(2, 4)
+    store.add(keys, vectors)
+
+    rows = store.lookup([text_key("gamma"), text_key("delta"), text_key("  alpha\nbeta ")])
+    assert rows.tolist() == [1, -1, 0]
+    assert np.array_equal(store.vectors(rows[[0, 2]]), vectors[[1, 0]])
+    assert store.stats() == {"hits": 2, "misses": 1, "rows": 2}
+
+def test_reopen_reads_memory_map(tmp_path):
+    EmbeddingStore(tmp_path, MODEL_NAME, dim=3).add([text_key("x")], np.ones((1, 3)))
+    reopened = EmbeddingStore(tmp_path, MODEL_NAME, dim=3)
+    assert len(reopened) == 1
+    assert isinstance(reopened._vectors, np.memmap)
+    assert reopened.vectors(reopened.lookup([text_key("x")])).tolist() == [[1.0, 1.0, 1.0]]
+
+def test_partial_append_is_dropped(tmp_path):
+    store = EmbeddingStore(tmp_path, MODEL_NAME, dim=2)
+    store.add([text_key("a")], np.zeros((1, 2)))
+    with open(store.vectors_path, "ab") as f:
+        f.write(b"\x00" * 5)  # interrupted write: vector bytes without a key
+    store.add([text_key("b")], np.ones((1, 2)))
+
+    reopened = EmbeddingStore(tmp_path, MODEL_NAME, dim=2)
+    assert reopened.vectors(reopened.lookup([text_key("b")])).tolist() == [[1.0, 1.0]]
+
+def key_vector(i, dim):
+    return np.full(dim, i, dtype=np.float32)
+
+def add_many(directory, worker, batches, dim):
+    store = EmbeddingStore(directory, MODEL_NAME, dim=dim)
+    for batch in range(batches):
+        # Every worker also adds key 0, so writers race on the same key too
+        ids = [0] + [1 + worker * batches * 2 + batch * 2 + j for j in range(2)]
+        store.add([text_key(str(i)) for i in ids], np.stack([key_vector(i, dim) for i in ids]))
+
+def test_concurrent_writer_processes(tmp_path):
+    workers, batches, dim = 4, 100, 8
+    context = multiprocessing.get_context("fork")
+    processes = [context.Process(target=add_many, args=(tmp_path, w, batches, dim)) for w in range(workers)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    assert [process.exitcode for process in processes] == [0] * workers
+
+    store = EmbeddingStore(tmp_path, MODEL_NAME, dim=dim)
+    ids = [0] + [1 + i for i in range(workers * batches * 2)]
+    rows = store.lookup([text_key(str(i)) for i in ids])
+    assert (rows >= 0).all()
+    assert len(store) == len(ids)
+    assert np.array_equal(store.vectors(rows), np.stack([key_vector(i, dim) for i in ids]))
+
+def test_refresh_tolerates_a_shrunken_vector_file(tmp_path):
+    store = EmbeddingStore(tmp_path, MODEL_NAME, dim=2)
+    store.add([text_key("a"), text_key("b")], np.ones((2, 2)))
+    os.truncate(store.vectors_path, 8 + 3)  # one full row plus a partial one
+    store._rows = 0
+    store.refresh()
+    assert len(store) == 1
+
+def test_keys_ending_in_nul_bytes(tmp_path):
+    store = EmbeddingStore(tmp_path, MODEL_NAME, dim=2)
+    keys = [b"\x01" * 15 + b"\x00", b"\x02" * 14 + b"\x00\x00"]
+    store.add(keys, np.eye(2))
+    reopened = EmbeddingStore(tmp_path, MODEL_NAME, dim=2)
+    assert reopened.vectors(reopened.lookup(keys)).tolist() == [[1.0, 0.0], [0.0, 1.0]]
@@ -0,0 +1,78 @@
+import json
+import threading
+from pathlib import Path
+from app import instrument, loader, outline, utils
+
+BASE_PATH = Path(__file__).resolve().parent.parent
+PDF_PATH = BASE_PATH / "Challenge_1b" / "Collection 1" / "PDFs" / "South of France - Cuisine.pdf"
+
+def extract():
+    blocks = loader.load(PDF_PATH)
+    return blocks, utils.section_slices(blocks, outline.build(blocks))
+
+def test_profiles_pipeline_functions(tmp_path, monkeypatch):
+    monkeypatch.setattr(loader, "cache", loader.DiskCache(tmp_path))
+    profiler = instrument.Profiler()
+    with instrument.activate(profiler):
+        blocks, sections = extract()
+        extract()
+    assert instrument.active() is None
+
+    snapshot = json.loads(profiler.to_json())
+    assert {"loader.load", "outline.build", "utils.section_slices"} <= snapshot["stages"].keys()
+    assert snapshot["stages"]["loader.load"]["calls"] == 2
+    assert snapshot["counters"] == {
+        "parse_cache_misses": 1,
+        "parse_cache_hits": 1,
+        "blocks": 2 * len(blocks),
+        "sections": 2 * len(sections),
+    }
+    assert snapshot["peak_rss_bytes"] > 0
+
+def test_inactive_records_nothing():
+    calls = []
+
+    @instrument.instrumented("noop")
+    def noop(x):
+        calls.append(x)
+        instrument.count("things")
+        return x
+
+    assert noop(3) == 3 and calls == [3]
+    assert instrument.active() is None
+
+def test_concurrent_runs_keep_their_own_profiler():
+    @instrument.instrumented("work")
+    def work():
+        instrument.count("things")
+
+    profilers = [instrument.Profiler() for _ in range(4)]
+    barrier = threading.Barrier(len(profilers))
+
+    def run(profiler, calls):
+        with instrument.activate(profiler):
+            barrier.wait()  # every thread has activated before any works
+            for _ in range(calls):
+                work()
+
+    threads = [threading.Thread(target=run, args=(p, i + 1)) for i, p in enumerate(profilers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert [p.counters["things"] for p in profilers] == [1, 2, 3, 4]
+    assert [p.stages["work"]["calls"] for p in profilers] == [1, 2, 3, 4]
+    assert instrument.active() is None
+
+def test_prometheus_text():
+    profiler = instrument.Profiler()
+    with profiler.stage("embed.encode"):
+        pass
+    profiler.count("blocks", 7)
+    text = profiler.to_prometheus({"collection": 'Collection "1"'})
+
+    assert "# TYPE pdi_stage_wall_seconds gauge" in text
+    assert 'pdi_stage_calls{collection="Collection \\"1\\"",stage="embed.encode"} 1' in text
+    assert 'pdi_blocks_total{collection="Collection \\"1\\""} 7' in text
+    assert text.endswith("\n")
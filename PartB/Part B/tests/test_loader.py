@@ -0,0 +1,36 @@
+from pathlib import Path
+import pytest
+from app import loader
+
+BASE_PATH = Path(__file__).resolve().parent.parent
+PDF_FILES = sorted((BASE_PATH / "Challenge_1b").glob("*/PDFs/*.pdf"))[::5]
+
+def words(blocks):
+    return set(" ".join(b["text"] for b in blocks).split())
+
+@pytest.mark.parametrize("pdf_file", PDF_FILES, ids=lambda p: p.name)
+def test_pymupdf_matches_pdfminer(pdf_file):
+    """
+    Block boundaries differ between the engines, so compare the recovered
+    text, page range, font sizes and coordinate frame rather than blocks.
+    """
+    reference = loader.load(pdf_file, backend="pdfminer", use_cache=False)
+    fast = loader.load(pdf_file, backend="pymupdf", use_cache=False)
+
+    assert set(fast[0]) == set(reference[0]) == {"text", "font_size", "x0", "y0", "page"}
+    assert {b["page"] for b in fast} == {b["page"] for b in reference}
+
+    ref_words, fast_words = words(reference), words(fast)
+    assert len(ref_words & fast_words) / len(ref_words | fast_words) > 0.95
+
+    ref_sizes = sorted(b["font_size"] for b in reference)
+    fast_sizes = sorted(b["font_size"] for b in fast)
+    assert abs(ref_sizes[len(ref_sizes) // 2] - fast_sizes[len(fast_sizes) // 2]) < 0.5
+    assert abs(max(ref_sizes) - max(fast_sizes)) < 1.0
+
+    # Same bottom-left coordinate frame: blocks both engines cut identically line up
+    fast_by_key = {(b["page"], b["text"]): b for b in fast}
+    shared = [(b, fast_by_key[(b["page"], b["text"])]) for b in reference if (b["page"], b["text"]) in fast_by_key]
+    assert shared
+    offsets = sorted(abs(r["y0"] - f["y0"]) + abs(r["x0"] - f["x0"]) for r, f in shared)
+    assert offsets[len(offsets) // 2] < 2.0
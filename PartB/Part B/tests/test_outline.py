@@ -0,0 +1,68 @@
+import itertools
+import numpy as np
+from app import outline, utils
+
+def block(text, size, page=1):
+    return {"text": text, "font_size": size, "x0": 72.0, "y0": 700.0, "page": page}
+
+BODY = "Body text that runs on for a while, as paragraphs in a document do."
+
+def test_sections_span_body_text_up_to_next_heading():
+    blocks = [
+        block("Guide to the Region", 20),
+        block(BODY, 11),
+        block("Beaches", 15),
+        block(BODY, 11),
+        block(BODY, 11, page=2),
+        block("Food", 15, page=2),
+        block(BODY, 11, page=2),
+    ]
+    entries = outline.build(blocks)
+    assert [(e["title"], e["start_idx"], e["end_idx"]) for e in entries] == [
+        ("Guide to the Region", 0, 1), ("Beaches", 2, 4), ("Food", 5, 6),
+    ]
+    assert [e["level"] for e in entries] == ["H1", "H2", "H2"]
+
+    sections = utils.section_slices(blocks, entries)
+    assert sections[1]["text"] == " ".join(["Beaches", BODY, BODY])
+    assert sections[2]["page"] == 2
+
+def test_leading_text_and_no_headings_make_one_section():
+    blocks = [block(BODY, 11), block("Intro", 16), block(BODY, 11)]
+    assert [e["start_idx"] for e in outline.build(blocks)] == [0, 1]
+
+    body_only = [block(BODY, 11), block(BODY.lower(), 11)]
+    assert [(e["start_idx"], e["end_idx"]) for e in outline.build(body_only)] == [(0, 1)]
+
+def test_same_size_headings_fall_back_to_short_lines():
+    blocks = [
+        block("Coastal Adventures", 12),
+        block(BODY, 12),
+        block("• Beach hopping along the coast", 12),
+        block("Nightlife and Entertainment", 12),
+        block(BODY, 12),
+    ]
+    assert [e["title"] for e in outline.build(blocks)] == ["Coastal Adventures", "Nightlife and Entertainment"]
+
+def within_ss(values, labels):
+    return sum(((values[labels == c] - values[labels == c].mean()) ** 2).sum() for c in np.unique(labels))
+
+def test_exact_clustering_is_optimal():
+    rng = np.random.default_rng(0)
+    for _ in range(30):
+        sizes = rng.choice([9, 10, 10.5, 11, 12, 14, 16, 18, 24], size=25)
+        labels = outline.cluster_font_sizes_exact(sizes)
+        values = np.unique(sizes)
+        # Optimal 1-D clusters are contiguous runs of sorted values: try every split
+        best = min(
+            within_ss(sizes, np.searchsorted(values[[a, b]], sizes, side="right"))
+            for a, b in itertools.combinations(range(1, len(values)), 2)
+        )
+        assert np.isclose(within_ss(sizes, labels), best)
+
+def test_heading_levels_contract():
+    sizes = [24, 11, 11, 16, 11, 16.5, 24]
+    assert outline.heading_levels(sizes) == ["H1", "H3", "H3", "H2", "H3", "H2", "H1"]
+    assert outline.heading_levels(sizes, clustering="kmeans") == outline.heading_levels(sizes)
+    assert outline.heading_levels([12, 12]) == ["H1", "H1"]
+    assert outline.heading_levels([12, 14]) == ["H2", "H1"]
@@ -0,0 +1,76 @@
+import json
+import numpy as np
+from pathlib import Path
+from app import embed, instrument, loader, pipeline, summarise
+from app.main import extract_sections
+
+BASE_PATH = Path(__file__).resolve().parent.parent
+PDF_DIR = BASE_PATH / "Challenge_1b" / "Collection 1" / "PDFs"
+
+def test_parsed_documents_keep_order_and_match_inline():
+    pdf_files = sorted(PDF_DIR.glob("*.pdf"))
+    expected = [(pdf, extract_sections(pdf)) for pdf in pdf_files]
+
+    for workers, queue_size in [(0, 0), (2, 1), (3, 4)]:
+        assert list(pipeline.parsed_documents(pdf_files, workers=workers, queue_size=queue_size)) == expected
+
+def test_parsed_documents_bounds_work_in_flight():
+    pdf_files = sorted(PDF_DIR.glob("*.pdf"))
+    pulled = []
+
+    def files():
+        for pdf in pdf_files:
+            pulled.append(pdf)
+            yield pdf
+
+    documents = pipeline.parsed_documents(files(), workers=2, queue_size=1)
+    next(documents)
+    # One document consumed: the first three were submitted, plus one refill
+    assert len(pulled) == 4
+    documents.close()
+
+def fake_encode(texts, use_cache=True):
+    rng = np.random.default_rng(len(texts))
+    vectors = rng.normal(size=(len(texts), embed.EMBEDDING_DIM)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+def fake_refine_batch(sections, batch_size=None, model=None):
+    for section in sections:
+        section["subsection"] = {"refined_text": section["text"][:80]}
+    return sections
+
+def test_process_writes_profile(tmp_path, monkeypatch):
+    # The models are not under test here; only the stage plumbing is
+    monkeypatch.setenv("PDI_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(loader, "cache", loader.DiskCache(tmp_path / "parse"))
+    monkeypatch.setattr(embed, "encode", fake_encode)
+    monkeypatch.setattr(summarise, "refine_batch", fake_refine_batch)
+
+    output_dir = tmp_path / "out"
+    timings = pipeline.process(PDF_DIR.parent, output_dir, parse_workers=0, profile=True)
+
+    profile = json.loads((output_dir / "profile.json").read_text())
+    assert profile["pipeline_stages"] == timings
+    assert profile["counters"]["sections"] > 0
+    assert (output_dir / "profile.prom").read_text().startswith("#")
+    assert (output_dir / "challenge1b_output.json").is_file()
+
+def test_process_reports_the_sequential_stage_keys(tmp_path, monkeypatch):
+    monkeypatch.setenv("PDI_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(embed, "encode", fake_encode)
+    monkeypatch.setattr(summarise, "refine_batch", fake_refine_batch)
+
+    timings = pipeline.process(PDF_DIR.parent, tmp_path / "out", parse_workers=1)
+    assert timings.keys() == {"extract", "embed", "rank", "summarise", "output"}
+
+def test_summary_workers_report_to_the_active_profiler(monkeypatch):
+    @instrument.instrumented("summarise.refine_batch")
+    def refine_batch(sections, batch_size=None, model=None):
+        return fake_refine_batch(sections, batch_size, model)
+
+    monkeypatch.setattr(summarise, "refine_batch", refine_batch)
+    sections = [{"text": f"text {i}", "page": 1, "title": f"title {i}"} for i in range(6)]
+    profiler = instrument.Profiler()
+    with instrument.activate(profiler):
+        pipeline.summarise_parallel(sections, workers=3)
+    assert profiler.stages["summarise.refine_batch"]["calls"] == 3
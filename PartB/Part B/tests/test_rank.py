@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+from app.rank import TopK, select, top_k
+
+def top_k_reference(scores, k, groups=None, quota=None):
+    ranked = sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)
+    taken, counts = [], {}
+    for i in ranked:
+        if quota is not None:
+            if counts.get(groups[i], 0) >= quota:
+                continue
+            counts[groups[i]] = counts.get(groups[i], 0) + 1
+        taken.append(i)
+    return taken[:k]
+
+@pytest.mark.parametrize("k", [0, 1, 5, 37, 1000])
+def test_top_k_matches_sort(k):
+    rng = np.random.default_rng(k)
+    # Rounded scores so the cut regularly falls inside a run of ties
+    scores = np.round(rng.random(500), 2)
+    assert top_k(scores, k).tolist() == top_k_reference(scores.tolist(), k)
+
+@pytest.mark.parametrize("quota", [1, 2, 7])
+def test_top_k_quota(quota):
+    rng = np.random.default_rng(quota)
+    scores = np.round(rng.random(400), 2)
+    groups = [f"doc{g}.pdf" for g in rng.integers(0, 12, size=400)]
+    expected = top_k_reference(scores.tolist(), 20, groups, quota)
+    assert top_k(scores, 20, groups, quota).tolist() == expected
+
+@pytest.mark.parametrize("quota", [None, 2])
+def test_streaming_matches_in_memory(quota):
+    rng = np.random.default_rng(3)
+    scores = np.round(rng.random(1000), 2)
+    groups = rng.integers(0, 9, size=1000).tolist()
+    stream = TopK(k=15, quota=quota)
+    for start in range(0, 1000, 64):
+        batch = slice(start, start + 64)
+        stream.push(scores[batch], list(range(start, min(start + 64, 1000))), groups[batch])
+
+    assert [item for item, _ in stream.results()] == top_k(scores, 15, groups, quota).tolist()
+
+def test_select_assigns_ranks_to_selection():
+    sections = [{"text": t, "document": d} for t, d in
+                [("beach", "a.pdf"), ("food", "a.pdf"), ("beach party", "a.pdf"), ("beach bar", "b.pdf")]]
+    embeddings = np.eye(4)
+    selected = select(sections, embeddings, "beach", query_vec=np.array([0, 0, 1.0, 0.5]),
+                      lexical_scores=[0, 0, 0, 0], k=2, quota=1)
+
+    assert [s["text"] for s in selected] == ["beach party", "beach bar"]
+    assert [s["importance_rank"] for s in selected] == [1, 2]
+    assert "importance_rank" not in sections[0]
@@ -0,0 +1,101 @@
+import http.client
+import json
+import socket
+import threading
+import time
+import pytest
+from app.server import BadJob, JobRunner, make_server, process_job
+
+class UnixConnection(http.client.HTTPConnection):
+    def __init__(self, path):
+        super().__init__("localhost")
+        self.socket_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.socket_path)
+
+def request(socket_path, method, path, body=None):
+    conn = UnixConnection(str(socket_path))
+    conn.request(method, path, body=json.dumps(body) if body is not None else None)
+    response = conn.getresponse()
+    return response.status, json.loads(response.read())
+
+def serve(tmp_path, run_job, **kwargs):
+    socket_path = tmp_path / "pdi.sock"
+    server = make_server(JobRunner(run_job, **kwargs), socket_path=socket_path)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, socket_path
+
+def test_process_reports_stage_timings(tmp_path):
+    def run_job(job):
+        return {"output": job["output_dir"] + "/challenge1b_output.json", "timings": {"embed": 0.5}}
+
+    server, socket_path = serve(tmp_path, run_job)
+    try:
+        status, body = request(socket_path, "POST", "/process", {"collection_path": "c", "output_dir": "out"})
+        assert status == 200
+        assert body["output"] == "out/challenge1b_output.json"
+        assert body["timings"]["embed"] == 0.5
+        assert {"queued", "total"} <= body["timings"].keys()
+
+        assert request(socket_path, "POST", "/process", {"collection_path": "c"})[0] == 400
+        assert request(socket_path, "GET", "/health")[1]["completed"] == 1
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def test_only_bad_jobs_are_client_errors(tmp_path):
+    def run_job(job):
+        if job["collection_path"] == "missing":
+            raise BadJob("missing has no challenge1b_input.json")
+        raise ValueError("bug in the pipeline")
+
+    server, socket_path = serve(tmp_path, run_job)
+    try:
+        assert request(socket_path, "POST", "/process", {"collection_path": "missing", "output_dir": "out"})[0] == 400
+        assert request(socket_path, "POST", "/process", {"collection_path": "c", "output_dir": "out"})[0] == 500
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    with pytest.raises(BadJob):
+        process_job({"collection_path": str(tmp_path), "output_dir": str(tmp_path / "out")})
+
+def test_concurrency_limit_and_queue(tmp_path):
+    active, peak = [0], [0]
+    lock = threading.Lock()
+    release = threading.Event()
+
+    def run_job(job):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        release.wait(5)
+        with lock:
+            active[0] -= 1
+        return {"timings": {}}
+
+    server, socket_path = serve(tmp_path, run_job, max_concurrent=2, max_queue=2)
+    job = {"collection_path": "c", "output_dir": "out"}
+    try:
+        results = []
+        clients = [threading.Thread(target=lambda: results.append(request(socket_path, "POST", "/process", job)))
+                   for _ in range(4)]
+        for client in clients:
+            client.start()
+        while request(socket_path, "GET", "/health")[1]["queued"] < 2:
+            time.sleep(0.01)
+
+        # Two running and two waiting: a fifth job is turned away
+        assert request(socket_path, "POST", "/process", job)[0] == 503
+        release.set()
+        for client in clients:
+            client.join()
+
+        assert [status for status, _ in results] == [200] * 4
+        assert peak[0] == 2
+        assert max(body["timings"]["queued"] for _, body in results) > 0
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,33 @@
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from app.lazy import Lazy
+
+BASE_PATH = Path(__file__).resolve().parent.parent
+HEAVY_MODULES = ["torch", "transformers", "sentence_transformers", "sklearn", "pdfminer", "fitz", "pydantic", "faiss"]
+
+def test_importing_main_loads_no_models():
+    code = f"import sys, app.main; print([m for m in {HEAVY_MODULES!r} if m in sys.modules])"
+    result = subprocess.run([sys.executable, "-c", code], cwd=BASE_PATH, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
+
+def test_lazy_builds_once_across_threads():
+    calls = []
+
+    def factory():
+        calls.append(1)
+        time.sleep(0.05)
+        return object()
+
+    value = Lazy(factory)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(value.get())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
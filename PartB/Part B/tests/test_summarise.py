@@ -0,0 +1,22 @@
+import copy
+import pytest
+from pathlib import Path
+from app import loader, summarise
+
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+
+BASE_PATH = Path(__file__).resolve().parent.parent
+PDF_PATH = BASE_PATH / "Challenge_1b" / "Collection 1" / "PDFs" / "South of France - Cuisine.pdf"
+
+def sample_sections(n=6):
+    blocks = loader.load(PDF_PATH)
+    # Mix of short and long inputs so batches need padding
+    texts = [" ".join(b["text"] for b in blocks[i:i + 1 + 3 * (i % 3)]) for i in range(0, 4 * n, 4)]
+    return [{"text": text, "page": 1, "title": text[:40]} for text in texts[:n]]
+
+def test_refine_batch_matches_single_section_path():
+    sections = sample_sections()
+    single = [summarise.refine(copy.deepcopy(s))["subsection"]["refined_text"] for s in sections]
+    batched = summarise.refine_batch(copy.deepcopy(sections), batch_size=4)
+    assert [s["subsection"]["refined_text"] for s in batched] == single